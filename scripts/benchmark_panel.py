@@ -0,0 +1,86 @@
+# scripts/benchmark_panel.py
+
+import time
+import numpy as np
+import pandas as pd
+from src.data.data_collection import compute_features
+from src.data.panel import build_panel, compute_panel_features, compute_cross_sectional_features
+
+def make_universe(n_tokens=300, n_bars=2880, zero_volume_rate=0.3, seed=42):
+    """
+    Synthetic 1m bars for a token universe with ragged listing times and
+    zero-volume bars, which tie in the volume rank.
+    """
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2024-09-01', tz='UTC')
+    frames = []
+    for i in range(n_tokens):
+        offset = int(rng.integers(0, n_bars // 2))
+        n = n_bars - offset
+        frames.append(pd.DataFrame({
+            'address': f'token_{i:04d}',
+            'datetime': start + pd.to_timedelta(offset + np.arange(n), unit='min'),
+            'close': np.exp(np.cumsum(rng.normal(0, 0.02, n))) * 1e-4,
+            'volume': np.where(rng.random(n) < zero_volume_rate, 0.0, rng.lognormal(8, 2, n))
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+def per_group_features(df, lookback=96):
+    """
+    The current approach: per-token compute_features plus per-timestamp groupbys.
+    """
+    df = pd.concat([compute_features(token_data.copy()) for _, token_data in df.groupby('address')], ignore_index=True)
+    df['price_change_rank'] = df.groupby('datetime')['price_change'].rank(pct=True)
+    df['price_change_15m_rank'] = df.groupby('datetime')['price_change_15m'].rank(pct=True)
+    df['volume_rank'] = df.groupby('datetime')['volume'].rank(pct=True)
+    market_volume = df.groupby('datetime')['volume'].sum()
+    surge = market_volume / market_volume.rolling(lookback).mean().shift(1)
+    df['market_volume_surge'] = df['datetime'].map(surge)
+    return df
+
+def panel_features(df, lookback=96):
+    panel = build_panel(df, interval='1m')
+    features = compute_panel_features(panel)
+    features.update(compute_cross_sectional_features(panel, features, lookback))
+    return panel, features
+
+def check_matches(reference, panel, features):
+    """
+    Assert that every panel feature equals the per-group result on the bars both produce.
+
+    The panel stores float32, so two tokens whose inputs agree to about seven
+    digits can swap places or tie; rank features may therefore move by one
+    position (1 / tokens ranked at that timestamp).
+    """
+    merged = reference.merge(panel.to_frame(features), on=['address', 'datetime'], suffixes=('', '_panel'))
+    assert len(merged) == len(reference), f"{len(reference) - len(merged)} bars missing from the panel"
+    for name in features:
+        expected = merged[name].to_numpy(dtype=np.float64)
+        actual = merged[f'{name}_panel'].to_numpy(dtype=np.float64)
+        atol = 1e-5
+        if name.endswith('_rank'):
+            atol = 1 / merged.groupby('datetime')[name].transform('count').clip(lower=1).to_numpy() + 1e-6
+        matches = np.isclose(actual, expected, rtol=1e-4, atol=atol, equal_nan=True)
+        assert matches.all(), f"{name} differs on {(~matches).sum()} bars, max {np.nanmax(np.abs(actual - expected)):.3g}"
+
+def best_of(fn, repeats=3):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    for n_tokens, n_bars in [(100, 1440), (300, 2880), (1000, 2880)]:
+        df = make_universe(n_tokens, n_bars)
+        check_matches(per_group_features(df), *panel_features(df))
+        grouped = best_of(lambda: per_group_features(df), repeats=1)
+        panel = best_of(lambda: panel_features(df))
+        build = best_of(lambda: build_panel(df, interval='1m'))
+        print(f"{n_tokens} tokens x {n_bars} bars ({len(df)} rows): "
+              f"per-group {grouped * 1000:.1f} ms, panel {panel * 1000:.1f} ms "
+              f"(of which build {build * 1000:.1f} ms), speedup {grouped / panel:.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# scripts/benchmark_similarity.py
+
+import time
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from src.analysis.similarity_index import TrajectoryIndex
+
+def make_windows(n_windows, lookback_bars=32, seed=42):
+    """
+    Synthetic pre-event windows normalized like normalize_trajectory().
+
+    Windows are cut from random-walk price and lognormal volume series, so
+    their shape statistics resemble real trajectories rather than white noise.
+    """
+    rng = np.random.default_rng(seed)
+    n_series = max(1, n_windows // 200)
+    length = n_windows // n_series + lookback_bars
+    log_close = np.cumsum(rng.normal(0, 0.03, (n_series, length)), axis=1)
+    log_volume = np.log1p(rng.lognormal(8, 1.5, (n_series, length)))
+
+    price = sliding_window_view(log_close, lookback_bars, axis=1).reshape(-1, lookback_bars)
+    volume = sliding_window_view(log_volume, lookback_bars, axis=1).reshape(-1, lookback_bars)
+    price = price - price[:, -1:]
+    volume_std = volume.std(axis=1, keepdims=True)
+    volume = (volume - volume.mean(axis=1, keepdims=True)) / np.where(volume_std > 0, volume_std, 1)
+    windows = np.hstack([price, volume]).astype(np.float32)
+    return windows[rng.permutation(len(windows))[:n_windows]]
+
+def brute_force_distances(stored, queries, k, chunk=50):
+    distances = []
+    stored = stored.astype(np.float64)
+    stored_sq_norms = (stored ** 2).sum(axis=1)
+    for start in range(0, len(queries), chunk):
+        q = queries[start:start + chunk].astype(np.float64)
+        dist = (q ** 2).sum(axis=1)[:, None] - 2 * q @ stored.T + stored_sq_norms
+        distances.append(np.sqrt(np.clip(np.sort(np.partition(dist, k - 1, axis=1)[:, :k], axis=1), 0, None)))
+    return np.vstack(distances)
+
+def best_of(fn, repeats=5):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main(n_stored=100000, n_queries=300, lookback_bars=32):
+    stored = make_windows(n_stored, lookback_bars, seed=1)
+    queries = make_windows(n_queries, lookback_bars, seed=2)
+    dim = stored.shape[1]
+
+    # Floor: one float32 matrix product of every query against every vector
+    matmul = best_of(lambda: queries @ stored.T)
+    print(f"{n_queries} queries x {n_stored} windows x {dim} dims: matmul alone {matmul * 1000:.1f} ms")
+
+    for block_size in [2048, 8192, 32768]:
+        index = TrajectoryIndex(dim, block_size=block_size)
+        index.add(stored)
+        for k in [5, 10]:
+            elapsed = best_of(lambda: index.query(queries, k=k))
+            print(f"block {block_size:>6}, k={k:>2}: {elapsed * 1000:.1f} ms "
+                  f"({elapsed * 1e6 / n_queries:.0f} us per query)")
+
+    distances, _ = index.query(queries, k=10)
+    expected = brute_force_distances(stored, queries, k=10)
+    print(f"Max |distance difference| vs float64 brute force: {np.abs(distances - expected).max():.2e}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+# scripts/benchmark_tree_eval.py
+
+import time
+import numpy as np
+from src.models.model import create_xgboost_model
+from src.models.tree_export import FlatTreeEnsemble
+
+def make_dataset(n_rows=20000, n_features=20, missing_rate=0.05, seed=42):
+    """
+    Synthetic, imbalanced training data shaped like the live feature set in scripts/predict.py.
+    """
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((n_rows, n_features)).astype(np.float32)
+    y = ((X[:, 0] + X[:, 1] ** 2 - X[:, 2] * X[:, 3] + rng.standard_normal(n_rows)) > 2.5).astype(int)
+    X[rng.random(X.shape) < missing_rate] = np.nan
+    return X, y
+
+def time_call(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return np.median(timings)
+
+def main():
+    X, y = make_dataset()
+    model = create_xgboost_model()
+    model.fit(X, y)
+    ensemble = FlatTreeEnsemble.from_xgboost(model)
+
+    xgb_proba = model.predict_proba(X)
+    flat_proba = ensemble.predict_proba(X)
+    print(f"Trees: {len(ensemble.roots)}, max depth: {ensemble.max_depth}, nodes: {len(ensemble.feature)}")
+    print(f"Max |predict_proba difference|: {np.abs(xgb_proba - flat_proba).max():.2e}")
+    print(f"Labels identical: {(model.predict(X) == ensemble.predict(X)).all()}\n")
+
+    print(f"{'batch':>6} {'xgboost (us)':>14} {'flat numpy (us)':>16} {'speedup':>8}")
+    for batch_size in [1, 10, 100, 10000]:
+        batch = X[:batch_size]
+        repeats = 200 if batch_size <= 100 else 10
+        xgb_time = time_call(lambda: model.predict_proba(batch), repeats)
+        flat_time = time_call(lambda: ensemble.predict_proba(batch), repeats)
+        print(f"{batch_size:>6} {xgb_time * 1e6:>14.1f} {flat_time * 1e6:>16.1f} {xgb_time / flat_time:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@ import pandas as pd
 from src.data.data_collection import fetch_high_frequency_data
 from src.data.data_preprocessing import clean_data, preprocess_data
 from src.data.feature_engineering import add_custom_features
+from src.models.tree_export import FlatTreeEnsemble
 import joblib
 import time
 import numpy as np
@@ -11,6 +12,19 @@ import numpy as np
 def predict_new_tokens():
     # Load model
     model = joblib.load('models/saved_models/xgboost_model.pkl')
+    # Score single rows with flat NumPy trees instead of a DMatrix per call
+    ensemble = FlatTreeEnsemble.from_xgboost(model)
+
+    features = [
+        'return', 'volatility', 'volume_change', 'price_volume_corr',
+        'close_lag_1', 'close_lag_2', 'close_lag_3', 'close_lag_4', 'close_lag_5',
+        'volume_lag_1', 'volume_lag_2', 'volume_lag_3', 'volume_lag_4', 'volume_lag_5',
+        'ma_3', 'ma_5', 'ma_10', 'ema_3', 'ema_5', 'rsi'
+    ]
+    # The flat trees index columns by position, so check the order once here
+    # instead of relying on XGBoost's per-call feature name validation
+    if ensemble.feature_names is not None and list(ensemble.feature_names) != features:
+        raise ValueError(f"Model was trained on features {ensemble.feature_names}, expected {features}.")
 
     # Fetch new token listings
     from src.data.data_collection import fetch_new_token_listings
@@ -42,13 +56,6 @@ def predict_new_tokens():
         df = add_custom_features(df)
 
         # Use the most recent data point for prediction
-        features = [
-            'return', 'volatility', 'volume_change', 'price_volume_corr',
-            'close_lag_1', 'close_lag_2', 'close_lag_3', 'close_lag_4', 'close_lag_5',
-            'volume_lag_1', 'volume_lag_2', 'volume_lag_3', 'volume_lag_4', 'volume_lag_5',
-            'ma_3', 'ma_5', 'ma_10', 'ema_3', 'ema_5', 'rsi'
-        ]
-
         X_new = df[features].replace([np.inf, -np.inf], np.nan).fillna(0)
         X_new = X_new.tail(1)  # Get the latest data point
 
@@ -57,7 +64,7 @@ def predict_new_tokens():
             continue
 
         # Predict
-        prediction = model.predict(X_new)[0]
+        prediction = ensemble.predict(X_new.to_numpy())[0]
 
         if prediction == 1:
             print(f"Promising token detected: {row['token_name']}")
@@ -0,0 +1,348 @@
+# src/analysis/similarity_index.py
+
+import numpy as np
+import pandas as pd
+
+
+def load_events(filepath):
+    """
+    Load detected events from a detected_events_<window>.csv file.
+
+    main.py now writes to the EventStore (see load_events_from_store); this
+    reads CSVs from older runs or exported with detect_5x_events output.
+
+    Parameters:
+    - filepath (str): Path to an events CSV with 'start_time' and 'end_time' columns.
+
+    Returns:
+    - DataFrame: Events with parsed UTC start_time/end_time columns.
+    """
+    events_df = pd.read_csv(filepath)
+    events_df['start_time'] = pd.to_datetime(events_df['start_time'], utc=True)
+    events_df['end_time'] = pd.to_datetime(events_df['end_time'], utc=True)
+    return events_df
+
+
+def load_events_from_store(store, address=None, start=None, end=None, window=None):
+    """
+    Load event episodes from an EventStore in the layout load_events() returns.
+
+    Each episode becomes one event starting at its first detected start bar,
+    which is where the pre-event window should end.
+
+    Parameters:
+    - store (EventStore): Store written by main.py.
+    - address, start, end, window: Filters passed to EventStore.query().
+
+    Returns:
+    - DataFrame: Events with 'address', 'start_time', 'end_time', 'start_price',
+      'end_price', 'increase_factor', 'window_size', 'total_volume' and 'count'.
+    """
+    episodes = store.query(address=address, start=start, end=end, window=window)
+    events_df = episodes.rename(columns={
+        'first_start': 'start_time',
+        'peak_price': 'end_price',
+        'peak_increase_factor': 'increase_factor',
+        'window': 'window_size'
+    })
+    columns = ['address', 'start_time', 'end_time', 'start_price', 'end_price',
+               'increase_factor', 'window_size', 'total_volume', 'count']
+    events_df = events_df.reindex(columns=columns)
+    events_df['start_time'] = pd.to_datetime(events_df['start_time'], utc=True)
+    events_df['end_time'] = pd.to_datetime(events_df['end_time'], utc=True)
+    return events_df.reset_index(drop=True)
+
+
+def normalize_trajectory(close, volume):
+    """
+    Turn a window of closes and volumes into a fixed-length feature vector.
+
+    Prices are expressed as log returns relative to the last close, so tokens
+    at very different price levels are comparable. Volumes are log-scaled and
+    z-scored within the window, so only the shape of the volume profile counts.
+
+    Parameters:
+    - close (array): Close prices, oldest first.
+    - volume (array): Volumes aligned with close.
+
+    Returns:
+    - ndarray: float32 vector of length 2 * len(close).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+
+    price_part = np.log(close / close[-1])
+
+    log_volume = np.log1p(np.clip(volume, 0, None))
+    volume_std = log_volume.std()
+    volume_part = log_volume - log_volume.mean()
+    if volume_std > 0:
+        volume_part = volume_part / volume_std
+
+    return np.concatenate([price_part, volume_part]).astype(np.float32)
+
+
+def build_pre_event_vectors(historical_df, events_df, lookback_bars=32):
+    """
+    Build one normalized trajectory per event from the bars preceding it.
+
+    The window is the last `lookback_bars` bars strictly before the event's
+    start_time. Events without enough history are skipped, and events that
+    share the same token and start_time are only stored once.
+
+    Parameters:
+    - historical_df (DataFrame): Bar history with 'address', 'datetime', 'close', 'volume'.
+    - events_df (DataFrame): Events with 'address', 'start_time' and optionally 'increase_factor'.
+    - lookback_bars (int): Number of bars in each window.
+
+    Returns:
+    - ndarray: (n_windows, 2 * lookback_bars) float32 vectors.
+    - DataFrame: Metadata for each vector (address, start_time, increase_factor).
+    """
+    events_df = events_df.drop_duplicates(subset=['address', 'start_time'])
+    vectors = []
+    metadata = []
+
+    for address, token_events in events_df.groupby('address'):
+        token_data = historical_df[historical_df['address'] == address].sort_values('datetime')
+        if len(token_data) < lookback_bars:
+            continue
+
+        times = token_data['datetime'].values
+        close = token_data['close'].to_numpy(dtype=np.float64)
+        volume = token_data['volume'].to_numpy(dtype=np.float64)
+
+        # Index of the first bar at or after each event start
+        event_times = pd.to_datetime(token_events['start_time'], utc=True).values
+        positions = np.searchsorted(times, event_times, side='left')
+
+        for (_, event), position in zip(token_events.iterrows(), positions):
+            if position < lookback_bars:
+                continue
+            window = slice(position - lookback_bars, position)
+            vectors.append(normalize_trajectory(close[window], volume[window]))
+            metadata.append({
+                'address': address,
+                'start_time': event['start_time'],
+                'increase_factor': event.get('increase_factor', np.nan)
+            })
+
+    if not vectors:
+        return np.empty((0, 2 * lookback_bars), dtype=np.float32), pd.DataFrame(columns=['address', 'start_time', 'increase_factor'])
+
+    return np.vstack(vectors), pd.DataFrame(metadata)
+
+
+def latest_trajectories(historical_df, lookback_bars=32):
+    """
+    Build the trajectory of the most recent bars for every token.
+
+    Parameters:
+    - historical_df (DataFrame): Bar history with 'address', 'datetime', 'close', 'volume'.
+    - lookback_bars (int): Number of bars in each window.
+
+    Returns:
+    - ndarray: (n_tokens, 2 * lookback_bars) float32 vectors.
+    - list: Token addresses in the same order as the vectors.
+    """
+    vectors = []
+    addresses = []
+    for address, token_data in historical_df.groupby('address'):
+        if len(token_data) < lookback_bars:
+            continue
+        token_data = token_data.sort_values('datetime').tail(lookback_bars)
+        vectors.append(normalize_trajectory(token_data['close'].values, token_data['volume'].values))
+        addresses.append(address)
+
+    if not vectors:
+        return np.empty((0, 2 * lookback_bars), dtype=np.float32), []
+
+    return np.vstack(vectors), addresses
+
+
+class TrajectoryIndex:
+    """
+    Nearest-neighbour index over fixed-length trajectory vectors.
+
+    Vectors live in one contiguous float32 matrix that grows by doubling, so
+    inserts are amortized O(1) per row. Queries are answered by blocked
+    brute force: each block of stored vectors is compared against the whole
+    query batch with a single matrix product, and only the running top-k per
+    query is kept between blocks. Once every query has k neighbours, a block
+    only contributes the entries that beat the current k-th distance.
+    """
+
+    def __init__(self, dim, block_size=8192, initial_capacity=1024):
+        self.dim = dim
+        self.block_size = block_size
+        self._vectors = np.empty((initial_capacity, dim), dtype=np.float32)
+        self._sq_norms = np.empty(initial_capacity, dtype=np.float32)
+        self._size = 0
+        self._metadata = []
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def metadata(self):
+        """
+        Metadata for every stored vector, indexed by its position in the index.
+        """
+        if not self._metadata:
+            return pd.DataFrame()
+        return pd.concat(self._metadata, ignore_index=True)
+
+    def add(self, vectors, metadata=None):
+        """
+        Insert new vectors into the index.
+
+        Parameters:
+        - vectors (array): (n, dim) vectors to insert.
+        - metadata (DataFrame): Optional per-vector metadata with n rows.
+        """
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got {vectors.shape[1]}.")
+        if metadata is not None and len(metadata) != len(vectors):
+            raise ValueError("metadata must have one row per vector.")
+
+        n_new = len(vectors)
+        required = self._size + n_new
+        if required > len(self._vectors):
+            capacity = max(required, 2 * len(self._vectors))
+            grown = np.empty((capacity, self.dim), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            grown_norms = np.empty(capacity, dtype=np.float32)
+            grown_norms[:self._size] = self._sq_norms[:self._size]
+            self._vectors, self._sq_norms = grown, grown_norms
+
+        self._vectors[self._size:required] = vectors
+        self._sq_norms[self._size:required] = np.einsum('ij,ij->i', vectors, vectors)
+        self._size = required
+
+        if metadata is None:
+            metadata = pd.DataFrame(index=range(n_new))
+        self._metadata.append(pd.DataFrame(metadata).reset_index(drop=True))
+
+    def query(self, queries, k=10):
+        """
+        Find the k nearest stored vectors for every query vector.
+
+        Parameters:
+        - queries (array): (n_queries, dim) query vectors.
+        - k (int): Number of neighbours to return per query.
+
+        Returns:
+        - ndarray: (n_queries, k) Euclidean distances, nearest first.
+        - ndarray: (n_queries, k) positions of the neighbours in the index.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if queries.shape[1] != self.dim:
+            raise ValueError(f"Expected queries of dimension {self.dim}, got {queries.shape[1]}.")
+
+        n_queries = len(queries)
+        k = min(k, self._size)
+        if k == 0:
+            return np.empty((n_queries, 0), dtype=np.float32), np.empty((n_queries, 0), dtype=np.int64)
+
+        query_sq_norms = np.einsum('ij,ij->i', queries, queries)[:, None]
+        # Folding the -2 into the queries saves a pass over every block
+        scaled_queries = -2.0 * queries
+        best_dist = np.full((n_queries, k), np.inf, dtype=np.float32)
+        best_idx = np.full((n_queries, k), -1, dtype=np.int64)
+        rows = np.arange(n_queries)[:, None]
+        seen = 0
+
+        for block_start in range(0, self._size, self.block_size):
+            block_end = min(block_start + self.block_size, self._size)
+            block = self._vectors[block_start:block_end]
+
+            # Squared distances up to the per-query constant ||q||^2:
+            # ||x||^2 - 2 q.x, added in place on the matrix product.
+            dist = scaled_queries @ block.T
+            dist += self._sq_norms[block_start:block_end]
+
+            if seen < k:
+                # Until every query has k neighbours, merge the whole block.
+                if dist.shape[1] > k:
+                    part = np.argpartition(dist, k - 1, axis=1)[:, :k]
+                    dist = dist[rows, part]
+                    idx = part + block_start
+                else:
+                    idx = np.broadcast_to(np.arange(block_start, block_end), dist.shape)
+                merged_dist = np.concatenate([best_dist, dist], axis=1)
+                merged_idx = np.concatenate([best_idx, idx], axis=1)
+                keep = np.argsort(merged_dist, axis=1)[:, :k]
+                best_dist = merged_dist[rows, keep]
+                best_idx = merged_idx[rows, keep]
+                seen += block_end - block_start
+                continue
+
+            # Only entries closer than the current k-th neighbour can change
+            # the result, and there are usually very few of them.
+            # flatnonzero is far cheaper than a 2-D nonzero on a mostly-False mask
+            candidates = np.flatnonzero(dist < best_dist[:, -1:])
+            if len(candidates) == 0:
+                continue
+            cand_rows, cand_cols = np.divmod(candidates, dist.shape[1])
+
+            all_rows = np.concatenate([np.repeat(np.arange(n_queries), k), cand_rows])
+            all_dist = np.concatenate([best_dist.ravel(), dist[cand_rows, cand_cols]])
+            all_idx = np.concatenate([best_idx.ravel(), cand_cols + block_start])
+
+            order = np.lexsort((all_dist, all_rows))
+            sorted_rows = all_rows[order]
+            row_starts = np.searchsorted(sorted_rows, np.arange(n_queries))
+            rank = np.arange(len(order)) - row_starts[sorted_rows]
+            keep = order[rank < k]
+            best_dist = all_dist[keep].reshape(n_queries, k)
+            best_idx = all_idx[keep].reshape(n_queries, k)
+
+        best_dist = best_dist + query_sq_norms
+
+        return np.sqrt(np.clip(best_dist, 0, None)), best_idx
+
+
+def build_index_from_events(historical_df, events_df, lookback_bars=32):
+    """
+    Build a TrajectoryIndex of pre-event windows from detected events.
+
+    Parameters:
+    - historical_df (DataFrame): Bar history with 'address', 'datetime', 'close', 'volume'.
+    - events_df (DataFrame): Events, e.g. from load_events_from_store() or load_events().
+    - lookback_bars (int): Number of bars in each window.
+
+    Returns:
+    - TrajectoryIndex: Index holding one vector per usable event.
+    """
+    vectors, metadata = build_pre_event_vectors(historical_df, events_df, lookback_bars)
+    index = TrajectoryIndex(dim=2 * lookback_bars)
+    if len(vectors):
+        index.add(vectors, metadata)
+    return index
+
+
+def find_similar_tokens(index, historical_df, lookback_bars=32, k=5):
+    """
+    Match every token's latest trajectory against the historical pre-event windows.
+
+    Parameters:
+    - index (TrajectoryIndex): Index built with the same lookback_bars.
+    - historical_df (DataFrame): Recent bars for the live token universe.
+    - lookback_bars (int): Number of bars in each window.
+    - k (int): Number of neighbours per token.
+
+    Returns:
+    - DataFrame: One row per (token, neighbour) with distance and the matched event metadata.
+    """
+    vectors, addresses = latest_trajectories(historical_df, lookback_bars)
+    if not addresses or len(index) == 0:
+        return pd.DataFrame()
+
+    distances, positions = index.query(vectors, k=k)
+    matches = index.metadata.iloc[positions.ravel()].reset_index(drop=True)
+    matches = matches.add_prefix('match_')
+    matches.insert(0, 'address', np.repeat(addresses, positions.shape[1]))
+    matches.insert(1, 'rank', np.tile(np.arange(positions.shape[1]), len(addresses)))
+    matches.insert(2, 'distance', distances.ravel())
+    return matches
@@ -1,6 +1,7 @@
 # src/data/data_collection.py
 
 import requests
+import numpy as np
 import pandas as pd
 import yaml
 import time
@@ -8,6 +9,8 @@ from datetime import datetime, timedelta, timezone
 import logging
 import os
 
+from .resampling import INTERVAL_SECONDS, OHLCVPyramid, detection_interval
+
 logging.basicConfig(level=logging.INFO)
 
 def compute_features(df):
@@ -48,7 +51,16 @@ def load_token_list():
         token_list = yaml.safe_load(file)
     return token_list.get('tokens', [])
 
-def fetch_token_history(address, start_time, end_time, chain, interval, api_key):
+def request_token_history(address, start_time, end_time, chain, interval, api_key):
+    """
+    Request one range of OHLCV bars and clean them, without computing features.
+
+    Unlike fetch_token_history, request and parsing errors are raised to the
+    caller, so a failed range can be told apart from a range with no trades.
+
+    Returns:
+    - DataFrame: Cleaned bars, empty if the API has no data for the range.
+    """
     url = f"https://public-api.birdeye.so/defi/ohlcv?address={address}&type={interval}&time_from={start_time}&time_to={end_time}"
     headers = {
         "X-API-KEY": api_key,
@@ -56,49 +68,58 @@ def fetch_token_history(address, start_time, end_time, chain, interval, api_key)
         "x-chain": chain
     }
 
-    try:
-        response = requests.get(url, headers=headers)
-        print(f"API response status for token {address}: {response.status_code}")
-        response.raise_for_status()
-        data = response.json()
+    response = requests.get(url, headers=headers)
+    logging.debug(f"API response status for token {address}: {response.status_code}")
+    response.raise_for_status()
+    data = response.json()
 
-        if 'data' not in data or 'items' not in data['data'] or not data['data']['items']:
-            logging.warning(f"No data available for token {address}")
-            return pd.DataFrame()
+    if 'data' not in data or 'items' not in data['data'] or not data['data']['items']:
+        return pd.DataFrame()
 
-        # Create DataFrame from the 'items' list
-        df = pd.DataFrame(data['data']['items'])
-        # 'address' is already included in the data
+    # Create DataFrame from the 'items' list
+    df = pd.DataFrame(data['data']['items'])
+    # 'address' is already included in the data
 
-        # Rename columns to standardize the DataFrame
-        df.rename(columns={
-            'unixTime': 'timestamp',
-            'c': 'close',
-            'o': 'open',
-            'h': 'high',
-            'l': 'low',
-            'v': 'volume',
-            # 'lq': 'liquidity'  # Include if 'lq' exists in the response
-        }, inplace=True)
+    # Rename columns to standardize the DataFrame
+    df.rename(columns={
+        'unixTime': 'timestamp',
+        'c': 'close',
+        'o': 'open',
+        'h': 'high',
+        'l': 'low',
+        'v': 'volume',
+        # 'lq': 'liquidity'  # Include if 'lq' exists in the response
+    }, inplace=True)
+
+    # Convert 'timestamp' to datetime
+    df['datetime'] = pd.to_datetime(df['timestamp'], unit='s', utc=True)
+    df = df.sort_values('datetime').drop_duplicates()
 
-        # Convert 'timestamp' to datetime
-        df['datetime'] = pd.to_datetime(df['timestamp'], unit='s', utc=True)
-        df = df.sort_values('datetime').drop_duplicates()
+    # Ensure numeric data types
+    df['close'] = pd.to_numeric(df['close'], errors='coerce')
+    df['volume'] = pd.to_numeric(df.get('volume', pd.Series(0)), errors='coerce')
 
-        # Ensure numeric data types
-        df['close'] = pd.to_numeric(df['close'], errors='coerce')
-        df['volume'] = pd.to_numeric(df.get('volume', pd.Series(0)), errors='coerce')
+    # Replace NaN values in 'volume' column
+    df['volume'] = df['volume'].fillna(0)
 
-        # Replace NaN values in 'volume' column
-        df['volume'] = df['volume'].fillna(0)
+    # Data validation and cleaning
+    df = df[df['datetime'] <= datetime.now(timezone.utc)]
+    df = df[df['close'] > 0]
+    df.dropna(subset=['close'], inplace=True)
 
-        # Data validation and cleaning
-        df = df[df['datetime'] <= datetime.now(timezone.utc)]
-        df = df[df['close'] > 0]
-        df.dropna(subset=['close'], inplace=True)
+    # Add the token address to the DataFrame
+    df['address'] = address
 
-        # Add the token address to the DataFrame
-        df['address'] = address
+    return df
+
+def fetch_token_history(address, start_time, end_time, chain, interval, api_key):
+    try:
+        df = request_token_history(address, start_time, end_time, chain, interval, api_key)
+        print(f"Fetched {len(df)} bars for token {address}")
+
+        if df.empty:
+            logging.warning(f"No data available for token {address}")
+            return df
 
         return compute_features(df)
 
@@ -109,7 +130,156 @@ def fetch_token_history(address, start_time, end_time, chain, interval, api_key)
         logging.error(f"Error fetching data for token {address}: {e}")
         return pd.DataFrame()
 
-def fetch_historical_token_data(token_addresses, chain='solana', interval='15m', api_key=None):
+def fetch_token_history_paged(address, start_time, end_time, chain, interval, api_key, max_bars=1000,
+                              page_delay=0.2, max_retries=2):
+    """
+    Fetch a token's full history at one interval as a series of requests.
+
+    The OHLCV endpoint caps the number of bars per response, so the time range
+    is split into pages of at most `max_bars` bars. A failed page is retried
+    `max_retries` times; if it still fails, the missing range is raised rather
+    than skipped, so callers never resample across a silent gap.
+
+    Returns:
+    - DataFrame: Bars for the whole range, with features computed once over the full series.
+    """
+    page_seconds = max_bars * INTERVAL_SECONDS[interval]
+    pages = []
+    n_pages = 0
+    page_start = start_time
+    while page_start < end_time:
+        page_end = min(page_start + page_seconds, end_time)
+        for attempt in range(max_retries + 1):
+            try:
+                page = request_token_history(address, page_start, page_end, chain, interval, api_key)
+                break
+            except (requests.exceptions.RequestException, ValueError) as e:
+                missing = f"{pd.Timestamp(page_start, unit='s', tz='UTC')} to {pd.Timestamp(page_end, unit='s', tz='UTC')}"
+                if attempt == max_retries:
+                    raise RuntimeError(f"Failed to fetch {interval} bars for token {address} from {missing}: {e}") from e
+                logging.warning(f"Retrying {interval} bars for token {address} from {missing}: {e}")
+                time.sleep(page_delay * 2 ** (attempt + 1))
+        n_pages += 1
+        if not page.empty:
+            pages.append(page)
+        page_start = page_end
+        if page_start < end_time:
+            time.sleep(page_delay)
+
+    print(f"Fetched {sum(len(page) for page in pages)} bars in {n_pages} pages for token {address}")
+    if not pages:
+        return pd.DataFrame()
+
+    df = pd.concat(pages, ignore_index=True)
+    df = df.drop_duplicates(subset=['timestamp']).sort_values('datetime').reset_index(drop=True)
+    return compute_features(df)
+
+def fetch_high_frequency_data(token_address, start_timestamp, end_timestamp, chain='solana', interval='1m', api_key=None):
+    """
+    Fetch recent fine-grained bars for a single token.
+
+    Parameters:
+    - token_address (str): Token mint address.
+    - start_timestamp (int): Range start, Unix seconds.
+    - end_timestamp (int): Range end, Unix seconds.
+    - chain (str): Chain name sent as x-chain.
+    - interval (str): Bar interval.
+    - api_key (str): Birdeye API key, read from config/config.yaml when omitted.
+
+    Returns:
+    - DataFrame: Bars with the usual columns plus 'token_address' and 'price'
+      aliases used by data_preprocessing. Empty on failure.
+    """
+    if api_key is None:
+        api_key = load_config()['api_keys']['birdeye']
+
+    try:
+        df = fetch_token_history_paged(token_address, start_timestamp, end_timestamp, chain, interval, api_key)
+    except Exception as e:
+        logging.error(f"Error fetching high-frequency data for token {token_address}: {e}")
+        return pd.DataFrame()
+    if df.empty:
+        return df
+
+    df['token_address'] = df['address']
+    df['price'] = df['close']
+    return df
+
+def fetch_new_token_listings(chain='solana', limit=20, api_key=None):
+    """
+    Fetch the most recently listed tokens.
+
+    Parameters:
+    - chain (str): Chain name sent as x-chain.
+    - limit (int): Maximum number of listings to return.
+    - api_key (str): Birdeye API key, read from config/config.yaml when omitted.
+
+    Returns:
+    - DataFrame: Columns 'token_address', 'token_name', 'symbol', 'listed_time'
+      (Unix seconds) and 'liquidity', newest first. Empty on failure.
+    """
+    if api_key is None:
+        api_key = load_config()['api_keys']['birdeye']
+
+    url = f"https://public-api.birdeye.so/defi/v2/tokens/new_listing?time_to={int(time.time())}&limit={limit}"
+    headers = {
+        "X-API-KEY": api_key,
+        "accept": "application/json",
+        "x-chain": chain
+    }
+
+    try:
+        response = requests.get(url, headers=headers)
+        response.raise_for_status()
+        data = response.json()
+
+        if 'data' not in data or not data['data'].get('items'):
+            logging.warning("No new token listings returned")
+            return pd.DataFrame()
+
+        df = pd.DataFrame(data['data']['items'])
+        df.rename(columns={
+            'address': 'token_address',
+            'name': 'token_name',
+            'liquidityAddedAt': 'listed_time'
+        }, inplace=True)
+
+        df['listed_time'] = pd.to_datetime(df['listed_time'], utc=True, errors='coerce')
+        df['listed_time'] = (df['listed_time'] - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+        columns = [column for column in ['token_address', 'token_name', 'symbol', 'listed_time', 'liquidity'] if column in df.columns]
+        return df[columns].sort_values('listed_time', ascending=False).reset_index(drop=True)
+
+    except requests.exceptions.HTTPError as http_err:
+        logging.error(f"HTTP error occurred while fetching new listings: {http_err}")
+        return pd.DataFrame()
+    except Exception as e:
+        logging.error(f"Error fetching new listings: {e}")
+        return pd.DataFrame()
+
+def fetch_historical_token_data(token_addresses, chain='solana', interval='1m', api_key=None, pyramid=None):
+    """
+    Fetch bars for every token at the finest interval and detect 5x events.
+
+    Only `interval` is requested from the API; coarser bars for the detection
+    windows are resampled locally (see data/resampling.py). Tokens whose
+    history has a page that could not be fetched are skipped, so no bars are
+    resampled across a gap.
+
+    Parameters:
+    - pyramid (OHLCVPyramid): Optional pyramid from an earlier call; the new
+      bars are merged into it instead of building one from scratch.
+
+    Returns:
+    - DataFrame: Bars at `interval` for all tokens.
+    - list: Events for the 24-hour, 60-minute, 15-minute and 5-minute windows.
+    - OHLCVPyramid: The bar pyramid the events were detected on, for later
+      stages and incremental updates.
+    """
+    if pyramid is None:
+        pyramid = OHLCVPyramid(base_interval=interval)
+    elif pyramid.base_interval != interval:
+        raise ValueError(f"Pyramid base interval {pyramid.base_interval} does not match {interval}.")
+
     all_token_data = []
     end_time = int(datetime.now(timezone.utc).timestamp())
     start_time = int((datetime.now(timezone.utc) - timedelta(days=30)).timestamp())  # Fetch last 30 days of data
@@ -117,7 +287,7 @@ def fetch_historical_token_data(token_addresses, chain='solana', interval='15m',
     for address in token_addresses:
         print(f"Fetching data for token: {address}")
         try:
-            token_data = fetch_token_history(address, start_time, end_time, chain, interval, api_key)
+            token_data = fetch_token_history_paged(address, start_time, end_time, chain, interval, api_key)
             if not token_data.empty:
                 print(f"Data fetched for token {address}:")
                 print(token_data.head())
@@ -130,44 +300,89 @@ def fetch_historical_token_data(token_addresses, chain='solana', interval='15m',
 
     if all_token_data:
         historical_df = pd.concat(all_token_data, ignore_index=True)
-        events_1440min = detect_5x_events(historical_df, window_minutes=1440, min_volume=10000)
-        events_60min = detect_5x_events(historical_df, window_minutes=60, min_volume=10000)
-        events_15min = detect_5x_events(historical_df, window_minutes=15, min_volume=10000)
-        events_5min = detect_5x_events(historical_df, window_minutes=5, min_volume=10000)
-        return historical_df, events_1440min, events_60min, events_15min, events_5min
+        pyramid.update(historical_df)
+        events_1440min = detect_5x_events(pyramid.get(detection_interval(1440, interval)), window_minutes=1440, min_volume=10000)
+        events_60min = detect_5x_events(pyramid.get(detection_interval(60, interval)), window_minutes=60, min_volume=10000)
+        events_15min = detect_5x_events(pyramid.get(detection_interval(15, interval)), window_minutes=15, min_volume=10000)
+        events_5min = detect_5x_events(pyramid.get(detection_interval(5, interval)), window_minutes=5, min_volume=10000)
+        return historical_df, events_1440min, events_60min, events_15min, events_5min, pyramid
     else:
         logging.warning("No historical data fetched for any token.")
-        return pd.DataFrame(), [], [], [], []
+        return pd.DataFrame(), [], [], [], [], pyramid
+
+def _range_argmax(values, starts, stops):
+    """
+    Index of the first maximum of values[start:stop] for every (start, stop) pair.
+
+    Uses a sparse table of argmaxes over power-of-two spans, so each range is
+    answered from two overlapping spans. All ranges must be non-empty.
+    """
+    n = len(values)
+    table = [np.arange(n)]
+    span = 1
+    while 2 * span <= n:
+        previous = table[-1]
+        left, right = previous[:n - 2 * span + 1], previous[span:n - span + 1]
+        # Ties keep the left index, so the first maximum wins
+        table.append(np.where(values[right] > values[left], right, left))
+        span *= 2
+
+    level = np.floor(np.log2(stops - starts)).astype(np.int64)
+    result = np.empty(len(starts), dtype=np.int64)
+    for k in np.unique(level):
+        rows = level == k
+        left = table[k][starts[rows]]
+        right = table[k][stops[rows] - (1 << k)]
+        result[rows] = np.where(values[right] > values[left], right, left)
+    return result
 
 def detect_5x_events(df, window_minutes=15, min_volume=10000):
+    """
+    Find every bar from which the close reaches 5x within `window_minutes`.
+
+    Each bar opens a window covering bars with datetime in
+    [start_time, start_time + window_minutes]. Window bounds come from a
+    binary search on the sorted times, the peak from a range-max table and the
+    volume from a cumulative sum, so a token costs O(n log n) rather than one
+    DataFrame filter per bar.
+
+    Returns:
+    - list: One dict per qualifying window with 'address', 'start_time',
+      'end_time' (time of the peak), 'start_price', 'end_price',
+      'increase_factor', 'window_size' and 'total_volume'.
+    """
     events = []
+    window_size = pd.Timedelta(minutes=window_minutes)
     for address, token_data in df.groupby('address'):
-        token_data = token_data.sort_values('datetime').reset_index(drop=True)
-        
-        window_size = pd.Timedelta(minutes=window_minutes)
-        
-        for i in range(len(token_data)):
-            start_time = token_data.loc[i, 'datetime']
-            end_time = start_time + window_size
-
-            window_data = token_data[(token_data['datetime'] >= start_time) & (token_data['datetime'] <= end_time)]
-            
-            if len(window_data) > 1:
-                start_price = window_data.iloc[0]['close']
-                max_price = window_data['close'].max()
-                max_price_index = window_data['close'].idxmax()
-                end_time = window_data.loc[max_price_index, 'datetime']
-                total_volume = window_data['volume'].sum()
-
-                if max_price >= 5 * start_price and total_volume >= min_volume:
-                    events.append({
-                        'address': address,
-                        'start_time': start_time,
-                        'end_time': end_time,
-                        'start_price': start_price,
-                        'end_price': max_price,
-                        'increase_factor': max_price / start_price,
-                        'window_size': window_minutes,
-                        'total_volume': total_volume
-                    })
+        token_data = token_data.sort_values('datetime', kind='stable').reset_index(drop=True)
+        times = token_data['datetime']
+        close = token_data['close'].to_numpy(dtype=np.float64)
+        cumulative_volume = np.concatenate([[0.0], np.cumsum(token_data['volume'].to_numpy(dtype=np.float64))])
+
+        # A window starts at the first bar with the start time, which only
+        # differs from the bar itself when timestamps repeat
+        starts = times.searchsorted(times, side='left')
+        stops = times.searchsorted(times + window_size, side='right')
+        candidates = np.flatnonzero(stops - starts > 1)
+        if len(candidates) == 0:
+            continue
+
+        starts, stops = starts[candidates], stops[candidates]
+        peaks = _range_argmax(close, starts, stops)
+        start_prices = close[starts]
+        max_prices = close[peaks]
+        total_volumes = cumulative_volume[stops] - cumulative_volume[starts]
+
+        hits = np.flatnonzero((max_prices >= 5 * start_prices) & (total_volumes >= min_volume))
+        for j in hits:
+            events.append({
+                'address': address,
+                'start_time': times.iloc[candidates[j]],
+                'end_time': times.iloc[peaks[j]],
+                'start_price': start_prices[j],
+                'end_price': max_prices[j],
+                'increase_factor': max_prices[j] / start_prices[j],
+                'window_size': window_minutes,
+                'total_volume': total_volumes[j]
+            })
     return events
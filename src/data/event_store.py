@@ -0,0 +1,248 @@
+# src/data/event_store.py
+
+import os
+import re
+import uuid
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# <project root>/data/events, independent of the working directory
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data', 'events')
+
+PARTITIONING = ds.partitioning(pa.schema([('window', pa.int64()), ('date', pa.string())]), flavor='hive')
+
+EPISODE_COLUMNS = [
+    'address', 'window', 'first_start', 'last_start', 'end_time',
+    'start_price', 'peak_price', 'peak_increase_factor', 'total_volume',
+    'count', 'ingested_at', 'date'
+]
+
+
+def _to_utc(value):
+    timestamp = pd.Timestamp(value)
+    return timestamp.tz_localize('UTC') if timestamp.tzinfo is None else timestamp.tz_convert('UTC')
+
+
+def collapse_episodes(events, window_minutes=None):
+    """
+    Merge overlapping detections of the same token into episodes.
+
+    detect_5x_events reports one event per starting bar, so a single pump
+    shows up as a run of events starting on consecutive bars. Events of one
+    token (and window) whose [start_time, end_time] intervals overlap are
+    merged into one episode.
+
+    Parameters:
+    - events (list or DataFrame): Events as returned by detect_5x_events.
+    - window_minutes (int): Window size, used when events carry no 'window_size'.
+
+    Returns:
+    - DataFrame: One row per episode with first/last start, peak and count columns.
+    """
+    df = pd.DataFrame(events)
+    if df.empty:
+        return pd.DataFrame(columns=EPISODE_COLUMNS[:-2])
+
+    if 'window_size' in df.columns:
+        df['window'] = df['window_size'].astype('int64')
+    else:
+        df['window'] = int(window_minutes)
+    df['start_time'] = pd.to_datetime(df['start_time'], utc=True)
+    df['end_time'] = pd.to_datetime(df['end_time'], utc=True)
+
+    df = df.sort_values(['address', 'window', 'start_time'], kind='stable').reset_index(drop=True)
+    group = [df['address'], df['window']]
+
+    # A new episode starts when an event begins after every earlier event of
+    # the same token has ended.
+    running_end = df.groupby(group)['end_time'].cummax()
+    previous_end = running_end.groupby(group).shift()
+    new_episode = previous_end.isna() | (df['start_time'] > previous_end)
+    df['episode'] = new_episode.cumsum()
+
+    episodes = df.groupby('episode').agg(
+        address=('address', 'first'),
+        window=('window', 'first'),
+        first_start=('start_time', 'min'),
+        last_start=('start_time', 'max'),
+        end_time=('end_time', 'max'),
+        start_price=('start_price', 'first'),
+        peak_price=('end_price', 'max'),
+        peak_increase_factor=('increase_factor', 'max'),
+        total_volume=('total_volume', 'max'),
+        count=('start_time', 'size')
+    ).reset_index(drop=True)
+    return episodes
+
+
+class EventStore:
+    """
+    Append-only Parquet store of event episodes.
+
+    Files are laid out as <root>/window=<minutes>/date=<YYYY-MM-DD>/part-*.parquet,
+    partitioned by window size and the date of the episode's first start.
+    Each append writes new part files with rows sorted by address and time,
+    so queries prune both partitions and row groups.
+
+    Every pipeline run re-detects the same history, so reading back merges the
+    copies: episodes with the same (address, window, first_start) keep the most
+    recently ingested row, and any episodes that still overlap are collapsed.
+    compact() applies the same merge on disk, so the stored copies do not
+    accumulate from run to run.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+
+    def append(self, events, window_minutes=None):
+        """
+        Collapse events into episodes and write them in one columnar batch.
+
+        Parameters:
+        - events (list or DataFrame): Events as returned by detect_5x_events.
+        - window_minutes (int): Window size, used when events carry no 'window_size'.
+
+        Returns:
+        - int: Number of episodes written.
+        """
+        episodes = collapse_episodes(events, window_minutes)
+        if episodes.empty:
+            return 0
+
+        episodes['ingested_at'] = pd.Timestamp(datetime.now(timezone.utc))
+        episodes['date'] = episodes['first_start'].dt.strftime('%Y-%m-%d')
+        self._write(episodes)
+        return len(episodes)
+
+    def _write(self, episodes):
+        episodes = episodes.sort_values(['window', 'date', 'address', 'first_start'])[EPISODE_COLUMNS]
+        table = pa.Table.from_pandas(episodes, preserve_index=False)
+        pq.write_to_dataset(
+            table,
+            root_path=self.root,
+            partition_cols=['window', 'date'],
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet"
+        )
+
+    def compact(self):
+        """
+        Rewrite every partition that holds more than one part file as a single file.
+
+        The copies of each episode are merged with the same rules as query(),
+        so results are unchanged while storage and query time stay in line
+        with the number of distinct episodes. The merged file is written
+        before the old parts are removed.
+
+        Returns:
+        - int: Number of partitions rewritten.
+        """
+        if not os.path.isdir(self.root):
+            return 0
+
+        rewritten = 0
+        for directory, _, filenames in os.walk(self.root):
+            parts = sorted(os.path.join(directory, name) for name in filenames if name.endswith('.parquet'))
+            if len(parts) < 2:
+                continue
+            dataset = ds.dataset(parts, format='parquet', partitioning=PARTITIONING, partition_base_dir=self.root)
+            self._write(self._merge_runs(dataset.to_table().to_pandas()))
+            for part in parts:
+                os.remove(part)
+            rewritten += 1
+        return rewritten
+
+    def import_csv(self, filepath, window_minutes=None):
+        """
+        Load a legacy detected_events_<window>.csv dump into the store.
+
+        Parameters:
+        - filepath (str): Path to the CSV.
+        - window_minutes (int): Window size; inferred from names like detected_events_24_hour.csv.
+
+        Returns:
+        - int: Number of episodes written.
+        """
+        if window_minutes is None:
+            match = re.search(r'_(\d+)_(hour|minute)', os.path.basename(filepath))
+            if not match:
+                raise ValueError(f"Cannot infer the window size from {filepath}; pass window_minutes.")
+            window_minutes = int(match.group(1)) * (60 if match.group(2) == 'hour' else 1)
+        return self.append(pd.read_csv(filepath), window_minutes)
+
+    def query(self, address=None, start=None, end=None, window=None, columns=None):
+        """
+        Load the episodes of one or more tokens that overlap a time range.
+
+        Parameters:
+        - address (str or list): Token address(es); all tokens when omitted.
+        - start (datetime or str): Keep episodes ending at or after start.
+        - end (datetime or str): Keep episodes starting at or before end.
+        - window (int or list): Window size(s) in minutes.
+        - columns (list): Columns to return; all when omitted.
+
+        Returns:
+        - DataFrame: Matching episodes sorted by address and first_start.
+        """
+        if not os.path.isdir(self.root):
+            return pd.DataFrame(columns=columns or EPISODE_COLUMNS)
+
+        dataset = ds.dataset(self.root, format='parquet', partitioning=PARTITIONING)
+        condition = None
+
+        def combine(expression):
+            return expression if condition is None else condition & expression
+
+        if window is not None:
+            windows = [window] if pd.api.types.is_scalar(window) else list(window)
+            condition = combine(ds.field('window').isin([int(value) for value in windows]))
+        if address is not None:
+            addresses = [address] if pd.api.types.is_scalar(address) else list(address)
+            condition = combine(ds.field('address').isin([str(value) for value in addresses]))
+        if end is not None:
+            end = _to_utc(end)
+            condition = combine(ds.field('date') <= end.strftime('%Y-%m-%d'))
+            condition = combine(ds.field('first_start') <= pa.scalar(end.to_pydatetime(), pa.timestamp('us', tz='UTC')))
+        if start is not None:
+            start = _to_utc(start)
+            condition = combine(ds.field('end_time') >= pa.scalar(start.to_pydatetime(), pa.timestamp('us', tz='UTC')))
+
+        df = dataset.to_table(filter=condition).to_pandas()
+        if df.empty:
+            return df.reindex(columns=columns or EPISODE_COLUMNS)
+
+        df = self._merge_runs(df)
+        return df[columns] if columns else df
+
+    @staticmethod
+    def _merge_runs(df):
+        """
+        Merge the copies of an episode written by different runs.
+        """
+        df = df.sort_values('ingested_at').drop_duplicates(subset=['address', 'window', 'first_start'], keep='last')
+        df = df.sort_values(['address', 'window', 'first_start'], kind='stable').reset_index(drop=True)
+
+        group = [df['address'], df['window']]
+        running_end = df.groupby(group)['end_time'].cummax()
+        previous_end = running_end.groupby(group).shift()
+        df['episode'] = (previous_end.isna() | (df['first_start'] > previous_end)).cumsum()
+
+        # Overlapping copies describe the same bars, so counts are not summed
+        merged = df.groupby('episode').agg(
+            address=('address', 'first'),
+            window=('window', 'first'),
+            first_start=('first_start', 'min'),
+            last_start=('last_start', 'max'),
+            end_time=('end_time', 'max'),
+            start_price=('start_price', 'first'),
+            peak_price=('peak_price', 'max'),
+            peak_increase_factor=('peak_increase_factor', 'max'),
+            total_volume=('total_volume', 'max'),
+            count=('count', 'max'),
+            ingested_at=('ingested_at', 'max'),
+            date=('date', 'first')
+        ).reset_index(drop=True)
+        return merged[EPISODE_COLUMNS]
@@ -0,0 +1,248 @@
+# src/data/panel.py
+
+import numpy as np
+import pandas as pd
+
+from .resampling import INTERVAL_SECONDS
+
+
+class TokenPanel:
+    """
+    Bars for a token universe laid out as aligned (tokens x timestamps) arrays.
+
+    Every field is a float32 array padded with NaN where a token has no bar,
+    and `mask` marks the cells that hold a real bar. Row i belongs to
+    tokens[i] and column j to timestamps[j]. `interval` is the bar interval
+    of a regular time axis, or None when the axis is just the union of the
+    bars' timestamps.
+    """
+
+    def __init__(self, tokens, timestamps, values, mask, interval=None):
+        self.tokens = tokens
+        self.timestamps = timestamps
+        self.values = values
+        self.mask = mask
+        self.interval = interval
+
+    @property
+    def shape(self):
+        return self.mask.shape
+
+    def __getitem__(self, field):
+        return self.values[field]
+
+    def to_frame(self, arrays):
+        """
+        Convert panel-shaped arrays back to a long frame, one row per real bar.
+
+        Parameters:
+        - arrays (dict): Column name -> (tokens x timestamps) array.
+
+        Returns:
+        - DataFrame: 'address', 'datetime' and one column per array.
+        """
+        token_idx, time_idx = np.nonzero(self.mask)
+        df = pd.DataFrame({
+            'address': self.tokens[token_idx],
+            'datetime': self.timestamps[time_idx]
+        })
+        for name, array in arrays.items():
+            df[name] = array[token_idx, time_idx]
+        return df
+
+
+def build_panel(df, fields=('close', 'volume'), interval=None):
+    """
+    Pivot a long bar frame into a TokenPanel.
+
+    Parameters:
+    - df (DataFrame): Bars with 'address', 'datetime' and the requested fields.
+    - fields (tuple): Columns to load into the panel.
+    - interval (str): Optional bar interval (e.g. '15m'). When given, the time
+      axis is the full regular grid between the first and last bar, so shifts
+      along it are shifts in wall-clock time. Otherwise the time axis is the
+      union of all timestamps in df.
+
+    Returns:
+    - TokenPanel: The aligned panel.
+    """
+    token_idx, tokens = pd.factorize(df['address'], sort=True)
+    datetimes = pd.DatetimeIndex(df['datetime'])
+
+    if interval is not None:
+        step = pd.Timedelta(seconds=INTERVAL_SECONDS[interval])
+        timestamps = pd.date_range(datetimes.min(), datetimes.max(), freq=step)
+        time_idx = np.asarray((datetimes - timestamps[0]) // step, dtype=np.int64)
+    else:
+        time_idx, timestamps = pd.factorize(datetimes, sort=True)
+        timestamps = pd.DatetimeIndex(timestamps)
+
+    shape = (len(tokens), len(timestamps))
+    mask = np.zeros(shape, dtype=bool)
+    mask[token_idx, time_idx] = True
+
+    values = {}
+    for field in fields:
+        array = np.full(shape, np.nan, dtype=np.float32)
+        array[token_idx, time_idx] = df[field].to_numpy(dtype=np.float32)
+        values[field] = array
+
+    return TokenPanel(pd.Index(tokens), timestamps, values, mask, interval)
+
+
+def shift(values, periods=1):
+    """
+    Shift a panel array along the time axis, padding with NaN.
+    """
+    shifted = np.full_like(values, np.nan)
+    if periods > 0:
+        shifted[:, periods:] = values[:, :-periods]
+    elif periods < 0:
+        shifted[:, :periods] = values[:, -periods:]
+    else:
+        shifted[:] = values
+    return shifted
+
+
+def pct_change(values, periods=1):
+    """
+    Percentage change over `periods` time steps for every token at once.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return values / shift(values, periods) - 1
+
+
+# Horizon in seconds of each fixed-time price change feature
+PRICE_CHANGE_HORIZONS = {
+    'price_change_5m': 300,
+    'price_change_15m': 900,
+    'price_change_1h': 3600
+}
+
+
+def compute_panel_features(panel):
+    """
+    Whole-array version of compute_features() in data_collection.py.
+
+    The 5m/15m/1h changes are taken over the number of bars that spans that
+    much wall-clock time at the panel's interval, and are NaN when the horizon
+    is not a whole number of bars (e.g. the 5m change on 15m bars). A token
+    with a missing bar gets NaN instead of a change measured across the gap.
+    'price_change' and 'volume_change' are bar-to-bar.
+
+    Parameters:
+    - panel (TokenPanel): Panel with 'close' and 'volume' fields, built with an interval.
+
+    Returns:
+    - dict: Feature name -> (tokens x timestamps) float32 array.
+    """
+    if panel.interval is None:
+        raise ValueError("compute_panel_features needs a panel built with build_panel(..., interval=...).")
+    bar_seconds = INTERVAL_SECONDS[panel.interval]
+
+    close = panel['close']
+    volume = panel['volume']
+
+    features = {'price_change': pct_change(close)}
+    for name, horizon in PRICE_CHANGE_HORIZONS.items():
+        periods, remainder = divmod(horizon, bar_seconds)
+        if periods == 0 or remainder:
+            features[name] = np.full(panel.shape, np.nan, dtype=np.float32)
+        else:
+            features[name] = pct_change(close, periods)
+
+    # Same rule as compute_features(): tokens that never traded get zeros
+    has_volume = (np.nansum(volume, axis=1) > 0)[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_change = pct_change(volume)
+        price_volume_ratio = close / np.where(volume == 0, 1, volume)
+    features['volume_change'] = np.where(has_volume, volume_change, 0).astype(np.float32)
+    features['price_volume_ratio'] = np.where(has_volume, price_volume_ratio, 0).astype(np.float32)
+
+    for name in features:
+        features[name][~panel.mask] = np.nan
+    return features
+
+
+def cross_sectional_rank(values):
+    """
+    Percentile rank of each token against the universe at every timestamp.
+
+    Parameters:
+    - values (array): (tokens x timestamps) array; NaN cells are left out.
+
+    Returns:
+    - ndarray: float32 ranks in (0, 1] matching pandas rank(pct=True):
+      1 = highest, tied values share their average rank, NaN where the
+      input is NaN.
+    """
+    valid = ~np.isnan(values)
+    # NumPy sorts NaN last, so valid cells take positions 0..count-1
+    order = np.argsort(values, axis=0, kind='stable')
+    ordered = np.take_along_axis(values, order, axis=0)
+
+    # Tied values form runs in the sorted order; every cell of a run gets the
+    # mean of the run's first and last 1-based positions.
+    n = values.shape[0]
+    positions = np.broadcast_to(np.arange(n)[:, None], values.shape)
+    new_run = np.ones(values.shape, dtype=bool)
+    new_run[1:] = ordered[1:] != ordered[:-1]
+    run_end = np.ones(values.shape, dtype=bool)
+    run_end[:-1] = new_run[1:]
+    first = np.maximum.accumulate(np.where(new_run, positions, 0), axis=0)
+    last = np.minimum.accumulate(np.where(run_end, positions, n)[::-1], axis=0)[::-1]
+    sorted_ranks = ((first + last) / 2 + 1).astype(np.float32)
+
+    ranks = np.empty(values.shape, dtype=np.float32)
+    np.put_along_axis(ranks, order, sorted_ranks, axis=0)
+
+    counts = valid.sum(axis=0).astype(np.float32)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ranks = ranks / counts
+    ranks[~valid] = np.nan
+    return ranks
+
+
+def market_volume_surge(volume, lookback=96):
+    """
+    Market-wide volume at each timestamp relative to its trailing average.
+
+    Parameters:
+    - volume (array): (tokens x timestamps) volume array.
+    - lookback (int): Number of preceding timestamps in the average.
+
+    Returns:
+    - ndarray: float32 ratio per timestamp, NaN until `lookback` timestamps are available.
+    """
+    total = np.nansum(volume, axis=0, dtype=np.float64)
+    cumulative = np.concatenate([[0.0], np.cumsum(total)])
+
+    surge = np.full(total.shape, np.nan)
+    trailing_mean = (cumulative[lookback:-1] - cumulative[:-lookback - 1]) / lookback
+    with np.errstate(divide='ignore', invalid='ignore'):
+        surge[lookback:] = total[lookback:] / trailing_mean
+    return surge.astype(np.float32)
+
+
+def compute_cross_sectional_features(panel, features, lookback=96):
+    """
+    Cross-sectional features computed over the whole panel.
+
+    Parameters:
+    - panel (TokenPanel): Panel with a 'volume' field.
+    - features (dict): Output of compute_panel_features().
+    - lookback (int): Window for the market volume surge.
+
+    Returns:
+    - dict: Feature name -> (tokens x timestamps) float32 array.
+    """
+    surge = market_volume_surge(panel['volume'], lookback)
+    market_surge = np.broadcast_to(surge, panel.shape).copy()
+    market_surge[~panel.mask] = np.nan
+
+    return {
+        'price_change_rank': cross_sectional_rank(features['price_change']),
+        'price_change_15m_rank': cross_sectional_rank(features['price_change_15m']),
+        'volume_rank': cross_sectional_rank(np.where(panel.mask, panel['volume'], np.nan)),
+        'market_volume_surge': market_surge
+    }
@@ -0,0 +1,280 @@
+# src/data/resampling.py
+
+import numpy as np
+import pandas as pd
+
+# Birdeye OHLCV interval names and their length in seconds
+INTERVAL_SECONDS = {
+    '1m': 60,
+    '3m': 180,
+    '5m': 300,
+    '15m': 900,
+    '30m': 1800,
+    '1H': 3600,
+    '2H': 7200,
+    '4H': 14400,
+    '6H': 21600,
+    '12H': 43200,
+    '1D': 86400
+}
+
+# Coarser levels derived locally from the finest fetched interval
+PYRAMID_LEVELS = ['5m', '15m', '1H', '4H', '1D']
+
+# Bar interval each detection window is run on. The 24-hour window keeps the
+# 15m resolution it always used; the short windows get bars fine enough to
+# resolve them.
+DETECTION_INTERVALS = {
+    1440: '15m',
+    60: '5m',
+    15: '1m',
+    5: '1m'
+}
+
+OHLCV_COLUMNS = ['address', 'timestamp', 'datetime', 'open', 'high', 'low', 'close', 'volume']
+
+# Per-token bar arrays held by OHLCVPyramid
+_BAR_FIELDS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+
+def _ensure_ohlcv(df):
+    """
+    Return the OHLCV columns of a bar frame, filling missing open/high/low from close.
+    """
+    df = df.copy()
+    for column in ['open', 'high', 'low']:
+        if column not in df.columns:
+            df[column] = df['close']
+        df[column] = pd.to_numeric(df[column], errors='coerce').fillna(df['close'])
+    if 'volume' not in df.columns:
+        df['volume'] = 0.0
+    if 'timestamp' not in df.columns:
+        df['timestamp'] = (df['datetime'] - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+    df['timestamp'] = df['timestamp'].astype('int64')
+    df['datetime'] = pd.to_datetime(df['timestamp'], unit='s', utc=True)
+    return df[OHLCV_COLUMNS]
+
+
+def resample_ohlcv(df, interval):
+    """
+    Aggregate bars into coarser bars of the given interval.
+
+    Buckets are aligned to multiples of the interval since the Unix epoch, the
+    same way the API aligns its own bars. Within a bucket: open is the first
+    open, high the highest high, low the lowest low, close the last close and
+    volume the sum.
+
+    Parameters:
+    - df (DataFrame): Finer bars with 'address', 'timestamp' (or 'datetime'), 'close' and
+      optionally 'open', 'high', 'low', 'volume'.
+    - interval (str): Target interval, e.g. '15m' or '1H'.
+
+    Returns:
+    - DataFrame: Resampled bars with the OHLCV_COLUMNS columns.
+    """
+    seconds = INTERVAL_SECONDS[interval]
+    bars = _ensure_ohlcv(df).sort_values(['address', 'timestamp'], kind='stable')
+    bars['timestamp'] = bars['timestamp'] // seconds * seconds
+
+    resampled = bars.groupby(['address', 'timestamp'], sort=False).agg(
+        open=('open', 'first'),
+        high=('high', 'max'),
+        low=('low', 'min'),
+        close=('close', 'last'),
+        volume=('volume', 'sum')
+    ).reset_index()
+    resampled['datetime'] = pd.to_datetime(resampled['timestamp'], unit='s', utc=True)
+    return resampled[OHLCV_COLUMNS]
+
+
+def detection_interval(window_minutes, base_interval='1m'):
+    """
+    Pick the bar interval used to detect events in a window of the given length.
+
+    Parameters:
+    - window_minutes (int): Detection window length.
+    - base_interval (str): Finest interval available.
+
+    Returns:
+    - str: Interval name, never finer than base_interval.
+    """
+    interval = DETECTION_INTERVALS.get(window_minutes, base_interval)
+    if INTERVAL_SECONDS[interval] < INTERVAL_SECONDS[base_interval]:
+        return base_interval
+    return interval
+
+
+class _BarBuffer:
+    """
+    One token's bars at one interval as growable column arrays sorted by timestamp.
+    """
+
+    def __init__(self, capacity=64):
+        self.size = 0
+        self.columns = {name: np.empty(capacity, dtype=np.int64 if name == 'timestamp' else np.float64)
+                        for name in _BAR_FIELDS}
+
+    def view(self, start=0):
+        return {name: column[start:self.size] for name, column in self.columns.items()}
+
+    def position(self, timestamp):
+        """
+        Index of the first stored bar at or after timestamp.
+        """
+        return int(np.searchsorted(self.columns['timestamp'][:self.size], timestamp, side='left'))
+
+    def replace_from(self, position, columns):
+        """
+        Drop the bars from position onwards and append the given columns.
+        """
+        required = position + len(columns['timestamp'])
+        capacity = len(self.columns['timestamp'])
+        if required > capacity:
+            capacity = max(required, 2 * capacity)
+            for name, column in self.columns.items():
+                grown = np.empty(capacity, dtype=column.dtype)
+                grown[:position] = column[:position]
+                self.columns[name] = grown
+        for name, column in self.columns.items():
+            column[position:required] = columns[name]
+        self.size = required
+
+
+def _aggregate(columns, seconds):
+    """
+    resample_ohlcv() for one token's sorted bar arrays.
+    """
+    buckets = columns['timestamp'] // seconds * seconds
+    if len(buckets) == 0:
+        return {name: column[:0] for name, column in columns.items()}
+
+    starts = np.flatnonzero(np.concatenate([[True], buckets[1:] != buckets[:-1]]))
+    ends = np.concatenate([starts[1:], [len(buckets)]]) - 1
+    return {
+        'timestamp': buckets[starts],
+        'open': columns['open'][starts],
+        'high': np.maximum.reduceat(columns['high'], starts),
+        'low': np.minimum.reduceat(columns['low'], starts),
+        'close': columns['close'][ends],
+        'volume': np.add.reduceat(columns['volume'], starts)
+    }
+
+
+class OHLCVPyramid:
+    """
+    Bars at the finest fetched interval plus every coarser level derived from them.
+
+    Each token keeps its own sorted arrays per level. An update only touches
+    the tokens it carries: their new base bars are written over the tail of
+    the stored series, and each coarser level recomputes the buckets from the
+    earliest touched one onwards. For bars arriving at the end of a series
+    that is the last bucket or two per level, independent of history length.
+    """
+
+    def __init__(self, base_interval='1m', levels=None):
+        levels = PYRAMID_LEVELS if levels is None else levels
+        base_seconds = INTERVAL_SECONDS[base_interval]
+        for interval in levels:
+            if INTERVAL_SECONDS[interval] % base_seconds != 0:
+                raise ValueError(f"Level {interval} is not a multiple of base interval {base_interval}.")
+
+        self.base_interval = base_interval
+        self.levels = [interval for interval in levels if INTERVAL_SECONDS[interval] > base_seconds]
+        self._tokens = {}
+        # Whole-level frames, built on first access after an update
+        self._frames = {}
+
+    @property
+    def intervals(self):
+        return [self.base_interval] + self.levels
+
+    @property
+    def tokens(self):
+        return sorted(self._tokens)
+
+    def get(self, interval, address=None):
+        """
+        Return the bars of one level.
+
+        Parameters:
+        - interval (str): One of self.intervals.
+        - address (str): Only return this token's bars; cheaper than the whole level.
+
+        Returns:
+        - DataFrame: Bars sorted by address and timestamp. The whole-level
+          frame is cached until the next update and must not be modified.
+        """
+        if interval not in self.intervals:
+            raise KeyError(f"Interval {interval} is not in the pyramid (available: {self.intervals}).")
+        if address is not None:
+            return self._frame(interval, [address] if address in self._tokens else [])
+        if interval not in self._frames:
+            self._frames[interval] = self._frame(interval, self.tokens)
+        return self._frames[interval]
+
+    def __getitem__(self, interval):
+        return self.get(interval)
+
+    def _frame(self, interval, addresses):
+        views = [self._tokens[address][interval].view() for address in addresses]
+        if not views:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+
+        df = pd.DataFrame({'address': np.repeat(addresses, [len(view['timestamp']) for view in views])})
+        for name in _BAR_FIELDS:
+            df[name] = np.concatenate([view[name] for view in views])
+        df['datetime'] = pd.to_datetime(df['timestamp'], unit='s', utc=True)
+        return df[OHLCV_COLUMNS]
+
+    def update(self, new_bars):
+        """
+        Merge new base-interval bars and refresh the affected coarser buckets.
+
+        Bars for an existing (address, timestamp) replace the stored bar, so a
+        still-forming bar can be re-sent as it updates.
+
+        Parameters:
+        - new_bars (DataFrame): Bars at the base interval.
+        """
+        if new_bars.empty:
+            return
+        new_bars = _ensure_ohlcv(new_bars).sort_values(['address', 'timestamp'], kind='stable')
+        new_bars = new_bars.drop_duplicates(subset=['address', 'timestamp'], keep='last')
+
+        columns = {name: new_bars[name].to_numpy() for name in _BAR_FIELDS}
+        for address, index in new_bars.groupby('address', sort=False).indices.items():
+            self._update_token(address, {name: column[index] for name, column in columns.items()})
+        self._frames.clear()
+
+    def _update_token(self, address, new):
+        if address not in self._tokens:
+            self._tokens[address] = {interval: _BarBuffer() for interval in self.intervals}
+        buffers = self._tokens[address]
+        base = buffers[self.base_interval]
+
+        first = new['timestamp'][0]
+        position = base.position(first)
+        if position < base.size:
+            # The new bars overlap the stored series: merge them with the
+            # stored tail, new bars winning on equal timestamps
+            tail = base.view(position)
+            kept = ~np.isin(tail['timestamp'], new['timestamp'])
+            merged = {name: np.concatenate([tail[name][kept], new[name]]) for name in _BAR_FIELDS}
+            order = np.argsort(merged['timestamp'], kind='stable')
+            new = {name: column[order] for name, column in merged.items()}
+        base.replace_from(position, new)
+
+        for interval in self.levels:
+            seconds = INTERVAL_SECONDS[interval]
+            bucket = first // seconds * seconds
+            level = buffers[interval]
+            level.replace_from(level.position(bucket), _aggregate(base.view(base.position(bucket)), seconds))
+
+
+def build_pyramid(df, base_interval='1m', levels=None):
+    """
+    Build an OHLCVPyramid from a frame of base-interval bars.
+    """
+    pyramid = OHLCVPyramid(base_interval, levels)
+    pyramid.update(df)
+    return pyramid
@@ -0,0 +1,316 @@
+# src/data/scheduler.py
+
+import heapq
+import logging
+import time
+
+import numpy as np
+import pandas as pd
+
+from .resampling import INTERVAL_SECONDS
+
+
+class PollingScheduler:
+    """
+    Decide which tokens to poll next within a fixed requests-per-minute budget.
+
+    Every token gets a hotness score from its latest bars: recent volatility,
+    the latest volume against its median, and how recently it was listed. Hot
+    tokens are polled close to `min_interval`, quiet ones close to
+    `max_interval`. Due tokens wait in a heap keyed by their next poll time;
+    when more tokens are due than the budget allows, tokens never polled and
+    then the hottest go first, and the rest stay due for the next call.
+
+    The budget is a token bucket refilled at requests_per_minute / 60 per
+    second and capped at one minute's worth of requests. Listing discovery
+    calls are paid from the same budget.
+    """
+
+    def __init__(self, requests_per_minute=60, min_interval=60, max_interval=1800,
+                 listing_interval=300, new_listing_window=6 * 3600,
+                 reference_volatility=0.02, adaptive=True):
+        self.requests_per_minute = requests_per_minute
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.listing_interval = listing_interval
+        self.new_listing_window = new_listing_window
+        self.reference_volatility = reference_volatility
+        self.adaptive = adaptive
+
+        self.tokens = {}
+        self._heap = []
+        self._budget = float(requests_per_minute)
+        self._budget_updated = None
+        self._next_listing_poll = None
+        self.requests_made = 0
+
+    def _refill(self, now):
+        if self._budget_updated is not None:
+            elapsed = max(0.0, now - self._budget_updated)
+            self._budget = min(self.requests_per_minute, self._budget + elapsed * self.requests_per_minute / 60)
+        self._budget_updated = now
+
+    def _spend(self):
+        self._budget -= 1
+        self.requests_made += 1
+
+    def _push(self, address):
+        state = self.tokens[address]
+        heapq.heappush(self._heap, (state['next_poll'], address))
+
+    def add_token(self, address, now, listed_at=None):
+        """
+        Start tracking a token; it is due for a poll immediately.
+
+        Its first score is the freshness term alone, since there are no bars yet.
+        """
+        if address in self.tokens:
+            return
+        self.tokens[address] = {
+            'listed_at': listed_at,
+            'score': 0.0,
+            'next_poll': now,
+            'last_poll': None,
+            'last_timestamp': None
+        }
+        self.tokens[address]['score'] = self.hotness(address, None, now)
+        self._push(address)
+
+    def listings_due(self, now):
+        """
+        Return True, and charge the budget, if it is time to look for new listings.
+        """
+        self._refill(now)
+        if self._next_listing_poll is not None and now < self._next_listing_poll:
+            return False
+        if self._budget < 1:
+            return False
+        self._spend()
+        self._next_listing_poll = now + self.listing_interval
+        return True
+
+    def discover(self, listings_df, now):
+        """
+        Track every token from a fetch_new_token_listings() frame that is not tracked yet.
+
+        Returns:
+        - list: Addresses added.
+        """
+        added = []
+        if listings_df is None or listings_df.empty:
+            return added
+        for row in listings_df.itertuples(index=False):
+            if row.token_address not in self.tokens:
+                listed_at = getattr(row, 'listed_time', None)
+                self.add_token(row.token_address, now, None if pd.isna(listed_at) else float(listed_at))
+                added.append(row.token_address)
+        return added
+
+    def hotness(self, address, bars, now):
+        """
+        Score a token from its latest bars; 0 is quiet, larger is hotter.
+
+        Parameters:
+        - address (str): Token address.
+        - bars (DataFrame): Recent bars with 'close' and 'volume'.
+        - now (float): Current time, Unix seconds.
+
+        Returns:
+        - float: Sum of the volatility, volume spike and freshness terms.
+        """
+        score = 0.0
+        if bars is not None and len(bars) > 2:
+            close = bars['close'].to_numpy(dtype=np.float64)
+            volume = bars['volume'].to_numpy(dtype=np.float64)
+
+            returns = np.diff(np.log(close[close > 0]))
+            if len(returns) > 1:
+                score += returns.std() / self.reference_volatility
+
+            median_volume = np.median(volume)
+            if median_volume > 0:
+                score += max(0.0, np.log(volume[-1] / median_volume)) if volume[-1] > 0 else 0.0
+
+        listed_at = self.tokens[address]['listed_at']
+        if listed_at is not None:
+            age = now - listed_at
+            if 0 <= age < self.new_listing_window:
+                score += 4 * (1 - age / self.new_listing_window)
+
+        return score
+
+    def poll_interval(self, score):
+        """
+        Seconds until the next poll for a token with the given hotness.
+        """
+        if not self.adaptive:
+            return self.max_interval
+        return float(np.clip(self.max_interval / (1 + score), self.min_interval, self.max_interval))
+
+    def next_batch(self, now):
+        """
+        Pop the tokens to poll now, never-polled then hottest first, as far as the budget allows.
+
+        Returns:
+        - list: Addresses to poll. The budget is charged for each of them.
+        """
+        self._refill(now)
+
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            next_poll, address = heapq.heappop(self._heap)
+            # Skip stale heap entries left behind by rescheduling
+            if self.tokens[address]['next_poll'] == next_poll:
+                due.append(address)
+
+        # Tokens never polled go first: without bars their score is only a guess
+        due.sort(key=lambda address: (self.tokens[address]['last_poll'] is None, self.tokens[address]['score']),
+                 reverse=True)
+        n_allowed = min(len(due), int(self._budget))
+        batch = due[:n_allowed]
+        for _ in batch:
+            self._spend()
+
+        # Tokens over budget stay due
+        for address in due[n_allowed:]:
+            self._push(address)
+
+        return batch
+
+    def record_poll(self, address, bars, now):
+        """
+        Update a token's hotness from the bars just fetched and schedule its next poll.
+        """
+        state = self.tokens[address]
+        state['last_poll'] = now
+        if bars is not None and len(bars) > 0 and 'timestamp' in bars.columns:
+            state['last_timestamp'] = int(bars['timestamp'].iloc[-1])
+        state['score'] = self.hotness(address, bars, now)
+        state['next_poll'] = now + self.poll_interval(state['score'])
+        self._push(address)
+
+
+def run_scheduler(scheduler, fetch_bars, fetch_listings, on_bars=None, lookback=3600,
+                  clock=time.time, sleep=time.sleep, tick=1.0, max_ticks=None):
+    """
+    Poll the token universe forever (or for max_ticks ticks).
+
+    Parameters:
+    - scheduler (PollingScheduler): The scheduler.
+    - fetch_bars (callable): fetch_bars(address, start, end) -> DataFrame of bars,
+      e.g. fetch_high_frequency_data.
+    - fetch_listings (callable): fetch_listings() -> DataFrame, e.g. fetch_new_token_listings.
+    - on_bars (callable): Optional on_bars(address, bars) hook, e.g. for detection.
+    - lookback (int): Seconds of bars requested per poll.
+    - clock, sleep: Time source and sleep function.
+    - tick (float): Seconds between scheduling rounds.
+    - max_ticks (int): Stop after this many rounds.
+    """
+    ticks = 0
+    while max_ticks is None or ticks < max_ticks:
+        now = clock()
+        if scheduler.listings_due(now):
+            added = scheduler.discover(fetch_listings(), now)
+            if added:
+                logging.info(f"Discovered {len(added)} new tokens")
+
+        for address in scheduler.next_batch(now):
+            bars = fetch_bars(address, int(now - lookback), int(now))
+            scheduler.record_poll(address, bars, now)
+            if on_bars is not None and bars is not None and not bars.empty:
+                on_bars(address, bars)
+
+        ticks += 1
+        sleep(tick)
+
+
+def simulate_polling(historical_df, events, scheduler, tick=60, lookback=3600, start=None, end=None,
+                     interval=None):
+    """
+    Replay a local bar history through a scheduler and measure detection latency.
+
+    A token becomes discoverable at its first bar. A poll only returns bars
+    that have closed (timestamp + bar length <= now), so an event counts as
+    detected at the first poll at or after the close of its end_time bar (the
+    bar where the 5x was reached).
+
+    Parameters:
+    - historical_df (DataFrame): Bars with 'address', 'datetime', 'close', 'volume'.
+    - events (list or DataFrame): Events with 'address' and 'end_time', e.g. from detect_5x_events.
+    - scheduler (PollingScheduler): A fresh scheduler to drive.
+    - tick (int): Simulated seconds between scheduling rounds.
+    - lookback (int): Seconds of bars returned per poll.
+    - start, end (float): Simulated time range in Unix seconds; defaults to the range of the bars.
+    - interval (str): Bar interval, e.g. '1m'; inferred from the smallest
+      gap between a token's bars when omitted.
+
+    Returns:
+    - dict: Request count and rate, event counts and latency statistics in seconds.
+    """
+    df = historical_df.sort_values(['address', 'datetime'])
+    seconds = (df['datetime'] - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+    feed = {}
+    for address, index in df.groupby('address').indices.items():
+        feed[address] = {
+            'timestamp': seconds.to_numpy()[index],
+            'close': df['close'].to_numpy()[index],
+            'volume': df['volume'].to_numpy()[index]
+        }
+
+    if interval is not None:
+        bar_seconds = INTERVAL_SECONDS[interval]
+    else:
+        gaps = np.concatenate([np.diff(bars['timestamp']) for bars in feed.values()])
+        bar_seconds = int(gaps[gaps > 0].min()) if (gaps > 0).any() else 0
+
+    first_seen = pd.Series({address: bars['timestamp'][0] for address, bars in feed.items()}).sort_values()
+    start = float(first_seen.min()) if start is None else start
+    end = float(max(bars['timestamp'][-1] for bars in feed.values())) if end is None else end
+
+    def fetch_listings(now):
+        listed = first_seen[first_seen <= now]
+        return pd.DataFrame({'token_address': listed.index, 'listed_time': listed.values})
+
+    def fetch_bars(address, window_start, window_end):
+        bars = feed[address]
+        # The bar that opened less than one bar ago is still forming
+        lo, hi = np.searchsorted(bars['timestamp'], [window_start, window_end - bar_seconds], side='right')
+        return pd.DataFrame({key: values[lo:hi] for key, values in bars.items()})
+
+    poll_times = {address: [] for address in feed}
+    now = start
+    while now <= end:
+        if scheduler.listings_due(now):
+            scheduler.discover(fetch_listings(now), now)
+        for address in scheduler.next_batch(now):
+            scheduler.record_poll(address, fetch_bars(address, now - lookback, now), now)
+            poll_times[address].append(now)
+        now += tick
+
+    events_df = pd.DataFrame(events)
+    latencies = []
+    missed = 0
+    if not events_df.empty:
+        events_df = events_df.drop_duplicates(subset=['address', 'end_time'])
+        event_seconds = (pd.to_datetime(events_df['end_time'], utc=True) - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+        event_seconds = event_seconds + bar_seconds
+        for address, event_time in zip(events_df['address'], event_seconds):
+            polls = np.asarray(poll_times.get(address, []))
+            position = np.searchsorted(polls, event_time, side='left')
+            if position < len(polls):
+                latencies.append(polls[position] - event_time)
+            else:
+                missed += 1
+
+    latencies = np.asarray(latencies, dtype=np.float64)
+    duration_minutes = max((end - start) / 60, 1e-9)
+    return {
+        'requests': scheduler.requests_made,
+        'requests_per_minute': scheduler.requests_made / duration_minutes,
+        'events': len(latencies) + missed,
+        'detected': len(latencies),
+        'missed': missed,
+        'mean_latency': float(latencies.mean()) if len(latencies) else np.nan,
+        'median_latency': float(np.median(latencies)) if len(latencies) else np.nan,
+        'p90_latency': float(np.percentile(latencies, 90)) if len(latencies) else np.nan
+    }
@@ -1,11 +1,11 @@
 # src/main.py
 
 import logging
-import csv
 from datetime import datetime, timedelta, timezone
 
 # Import functions from data_collection.py
 from data.data_collection import load_config, load_token_list, fetch_historical_token_data
+from data.event_store import EventStore
 
 def main():
     logging.basicConfig(level=logging.INFO)
@@ -17,16 +17,17 @@ def main():
     token_addresses = load_token_list()
     print(f"Loaded tokens: {token_addresses}")
 
-    # Set the interval
-    interval = '15m'
+    # Set the finest interval to fetch; coarser bars are resampled locally
+    interval = '1m'
 
-    # Fetch historical data
-    historical_df, events_1440min, events_60min, events_15min, events_5min = fetch_historical_token_data(
+    # Fetch historical data; the pyramid holds the bars at every derived interval
+    historical_df, events_1440min, events_60min, events_15min, events_5min, pyramid = fetch_historical_token_data(
         token_addresses, chain='solana', interval=interval, api_key=api_key
     )
 
     if not historical_df.empty:
         print("\nData collection successful!")
+        print("Bars per interval: " + ", ".join(f"{name}: {len(pyramid.get(name))}" for name in pyramid.intervals))
 
         # Display basic statistics for each token
         for address, token_data in historical_df.groupby('address'):
@@ -71,26 +72,15 @@ def main():
                 print(f"\n{window_size} window statistics:")
                 print("  No events detected.")
 
-        # Optional: Save events to CSV files
-        for window_size, events in [("24-hour", events_1440min), ("60-minute", events_60min), ("15-minute", events_15min), ("5-minute", events_5min)]:
+        # Append events to the partitioned event store
+        event_store = EventStore()
+        for window_size, window_minutes, events in [("24-hour", 1440, events_1440min), ("60-minute", 60, events_60min), ("15-minute", 15, events_15min), ("5-minute", 5, events_5min)]:
             if events:
-                filename = f"detected_events_{window_size.replace('-', '_')}.csv"
-                with open(filename, 'w', newline='') as csvfile:
-                    fieldnames = ['address', 'start_time', 'end_time', 'start_price', 'end_price', 'increase_factor', 'duration', 'total_volume']
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    writer.writeheader()
-                    for event in events:
-                        writer.writerow({
-                            'address': event['address'],
-                            'start_time': event['start_time'],
-                            'end_time': event['end_time'],
-                            'start_price': event['start_price'],
-                            'end_price': event['end_price'],
-                            'increase_factor': event['increase_factor'],
-                            'duration': (event['end_time'] - event['start_time']).total_seconds() / 60,
-                            'total_volume': event['total_volume']
-                        })
-                print(f"Events saved to {filename}")
+                n_episodes = event_store.append(events, window_minutes)
+                print(f"{len(events)} {window_size} events saved as {n_episodes} episodes to {event_store.root}")
+        # Each run re-detects the same history; merge the copies on disk
+        n_compacted = event_store.compact()
+        print(f"Compacted {n_compacted} event store partitions")
     else:
         print("No historical data fetched or all data was invalid. Please check your data source and processing logic.")
 
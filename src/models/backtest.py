@@ -0,0 +1,293 @@
+# src/models/backtest.py
+
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Bar panel shared with worker processes by parameter_sweep()
+_worker_panel = None
+
+
+def build_bar_panel(df, probability_column=None):
+    """
+    Split the bar history into contiguous per-token NumPy arrays.
+
+    Parameters:
+    - df (DataFrame): Bars with 'address', 'datetime', 'close', 'volume'.
+    - probability_column (str): Optional column holding model probabilities.
+
+    Returns:
+    - dict: address -> dict of arrays ('datetime', 'close', 'volume' and optionally 'probability').
+    """
+    df = df.sort_values(['address', 'datetime'])
+    panel = {}
+    for address, token_data in df.groupby('address', sort=False):
+        arrays = {
+            'datetime': token_data['datetime'].values,
+            'close': token_data['close'].to_numpy(dtype=np.float64),
+            'volume': token_data['volume'].to_numpy(dtype=np.float64)
+        }
+        if probability_column is not None:
+            arrays['probability'] = token_data[probability_column].to_numpy(dtype=np.float64)
+        panel[address] = arrays
+    return panel
+
+
+def attach_model_probabilities(df, model, features, column='probability'):
+    """
+    Score every bar with a trained classifier in a single predict_proba call.
+
+    Parameters:
+    - df (DataFrame): Bars with the model's feature columns.
+    - model: A fitted classifier exposing predict_proba.
+    - features (list): Feature columns in the order the model was trained on.
+    - column (str): Name of the output column.
+
+    Returns:
+    - DataFrame: A copy of df with the probability column added.
+    """
+    df = df.copy()
+    X = df[features].replace([np.inf, -np.inf], np.nan).fillna(0)
+    df[column] = model.predict_proba(X)[:, 1]
+    return df
+
+
+def rule_signals(close, volume, window_bars=4, increase_factor=5.0, min_volume=10000):
+    """
+    Vectorized, causal version of the detect_5x_events rule.
+
+    A bar fires when its close is at least `increase_factor` times the lowest
+    close of the window made of the preceding `window_bars` bars and the bar
+    itself, and the volume traded over that same window (bar included)
+    reaches `min_volume`. Only data up to the bar's close is used, so the
+    signal is what a live detector would have seen at that bar.
+
+    Parameters:
+    - close (array): Close prices.
+    - volume (array): Volumes.
+    - window_bars (int): Number of bars before the current one in the window.
+    - increase_factor (float): Required rise over the window low.
+    - min_volume (float): Minimum volume over the window.
+
+    Returns:
+    - ndarray: Boolean signal per bar.
+    """
+    n = len(close)
+    signals = np.zeros(n, dtype=bool)
+    if n <= window_bars:
+        return signals
+
+    window_low = sliding_window_view(close, window_bars + 1).min(axis=1)
+    cum_volume = np.concatenate([[0.0], np.cumsum(volume)])
+    window_volume = cum_volume[window_bars + 1:] - cum_volume[:-window_bars - 1]
+
+    signals[window_bars:] = (close[window_bars:] >= increase_factor * window_low) & (window_volume >= min_volume)
+    return signals
+
+
+def model_signals(probability, threshold=0.5):
+    """
+    Turn model probabilities into a boolean signal per bar.
+    """
+    return np.nan_to_num(probability, nan=0.0) >= threshold
+
+
+def compute_exits(close, entries, hold_bars, take_profit=None, stop_loss=None, chunk_cells=2 ** 22):
+    """
+    Find the exit bar for a trade entered at each of the given bars.
+
+    The trade is closed at the first bar within `hold_bars` whose close reaches
+    the take-profit or stop-loss level, otherwise at the close `hold_bars`
+    bars later (or at the last bar).
+
+    Parameters:
+    - close (array): Close prices.
+    - entries (array): Entry bar indices.
+    - hold_bars (int): Maximum holding period in bars.
+    - take_profit (float): Optional return that closes the trade, e.g. 1.0 for +100%.
+    - stop_loss (float): Optional loss that closes the trade, e.g. 0.3 for -30%.
+    - chunk_cells (int): Upper bound on the size of the (entries, hold_bars) return matrix.
+
+    Returns:
+    - ndarray: Exit bar index for each entry.
+    """
+    n = len(close)
+    exits = np.minimum(entries + hold_bars, n - 1)
+    if (take_profit is None and stop_loss is None) or len(entries) == 0:
+        return exits
+
+    # Forward-looking window of closes for every bar, padded past the end
+    padded = np.concatenate([close, np.full(hold_bars, np.nan)])
+    future = sliding_window_view(padded[1:], hold_bars)
+
+    chunk = max(1, chunk_cells // hold_bars)
+    for start in range(0, len(entries), chunk):
+        batch = entries[start:start + chunk]
+        returns = future[batch] / close[batch, None] - 1
+
+        hit = np.zeros(returns.shape, dtype=bool)
+        if take_profit is not None:
+            hit |= returns >= take_profit
+        if stop_loss is not None:
+            hit |= returns <= -stop_loss
+
+        any_hit = hit.any(axis=1)
+        first_hit = hit.argmax(axis=1)
+        exits[start:start + chunk] = np.where(any_hit, batch + 1 + first_hit, exits[start:start + chunk])
+    return exits
+
+
+def simulate_trades(close, signals, hold_bars=16, take_profit=None, stop_loss=None, fee=0.003, slippage=0.01):
+    """
+    Take one position at a time: enter on a signal bar, leave at its exit bar.
+
+    Exit bars and prices are computed as arrays for every signal bar; only the
+    selection of non-overlapping trades walks the (sparse) signal bars.
+
+    Parameters:
+    - close (array): Close prices.
+    - signals (array): Boolean signal per bar.
+    - hold_bars, take_profit, stop_loss: Exit rules, see compute_exits().
+    - fee (float): Proportional fee per side.
+    - slippage (float): Proportional price impact per side.
+
+    Returns:
+    - ndarray: Entry bar indices of the trades taken.
+    - ndarray: Net return of each trade.
+    """
+    candidates = np.flatnonzero(signals)
+    # The last bar has nowhere to exit to
+    candidates = candidates[candidates < len(close) - 1]
+    exits = compute_exits(close, candidates, hold_bars, take_profit, stop_loss)
+
+    taken = []
+    next_free = 0
+    for position, entry in enumerate(candidates):
+        if entry >= next_free:
+            taken.append(position)
+            next_free = exits[position] + 1
+    taken = np.asarray(taken, dtype=np.int64)
+
+    entry_price = close[candidates[taken]] * (1 + slippage)
+    exit_price = close[exits[taken]] * (1 - slippage)
+    net_returns = (exit_price / entry_price) * (1 - fee) ** 2 - 1
+    return candidates[taken], net_returns
+
+
+def count_alerts(signals, cooldown_bars=0):
+    """
+    Count the alerts a signal would fire: rising edges, optionally with a cooldown.
+    """
+    if len(signals) == 0:
+        return 0
+    fired = np.flatnonzero(signals & ~np.concatenate([[False], signals[:-1]]))
+    if cooldown_bars <= 0 or len(fired) == 0:
+        return len(fired)
+    count = 1
+    last = fired[0]
+    for index in fired[1:]:
+        if index - last > cooldown_bars:
+            count += 1
+            last = index
+    return count
+
+
+def backtest_token(arrays, strategy='rule', window_bars=4, increase_factor=5.0, min_volume=10000,
+                   threshold=0.5, hold_bars=16, take_profit=None, stop_loss=None,
+                   fee=0.003, slippage=0.01, cooldown_bars=0):
+    """
+    Backtest one token's bar arrays.
+
+    Parameters:
+    - arrays (dict): Per-token arrays from build_bar_panel().
+    - strategy (str): 'rule' for detect_5x_events-style thresholds, 'model' for probabilities.
+    - Remaining parameters are passed to rule_signals/model_signals,
+      simulate_trades and count_alerts.
+
+    Returns:
+    - dict: Alert count, trade count, winning trades and summed net return.
+    """
+    close = arrays['close']
+    if strategy == 'rule':
+        signals = rule_signals(close, arrays['volume'], window_bars, increase_factor, min_volume)
+    elif strategy == 'model':
+        if 'probability' not in arrays:
+            raise ValueError("Model backtests need a panel built with probability_column.")
+        signals = model_signals(arrays['probability'], threshold)
+    else:
+        raise ValueError(f"Unknown strategy: {strategy}")
+
+    _, net_returns = simulate_trades(close, signals, hold_bars, take_profit, stop_loss, fee, slippage)
+
+    return {
+        'alerts': count_alerts(signals, cooldown_bars),
+        'trades': len(net_returns),
+        'wins': int((net_returns > 0).sum()),
+        'pnl': float(net_returns.sum())
+    }
+
+
+def run_backtest(panel, **params):
+    """
+    Backtest a strategy across every token in the panel.
+
+    Parameters:
+    - panel (dict): Output of build_bar_panel().
+    - params: Keyword arguments for backtest_token().
+
+    Returns:
+    - dict: Totals across tokens: alerts, trades, hit_rate, pnl (sum of per-trade
+      net returns on a unit stake) and mean_return.
+    """
+    alerts = trades = wins = 0
+    pnl = 0.0
+    for arrays in panel.values():
+        result = backtest_token(arrays, **params)
+        alerts += result['alerts']
+        trades += result['trades']
+        wins += result['wins']
+        pnl += result['pnl']
+
+    return {
+        'alerts': alerts,
+        'trades': trades,
+        'hit_rate': wins / trades if trades else np.nan,
+        'pnl': pnl,
+        'mean_return': pnl / trades if trades else np.nan
+    }
+
+
+def _init_worker(panel):
+    global _worker_panel
+    _worker_panel = panel
+
+
+def _run_worker(params):
+    return {**params, **run_backtest(_worker_panel, **params)}
+
+
+def parameter_sweep(panel, param_grid, max_workers=None):
+    """
+    Run run_backtest() for every combination in a parameter grid across a process pool.
+
+    The panel is sent to each worker once, when the worker starts, rather than
+    with every task.
+
+    Parameters:
+    - panel (dict): Output of build_bar_panel().
+    - param_grid (dict): Parameter name -> list of values.
+    - max_workers (int): Pool size, defaults to the number of CPUs.
+
+    Returns:
+    - DataFrame: One row per combination with its parameters and results.
+    """
+    names = list(param_grid)
+    combinations = [dict(zip(names, values)) for values in itertools.product(*param_grid.values())]
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(panel,)) as executor:
+        results = list(executor.map(_run_worker, combinations))
+
+    return pd.DataFrame(results)
@@ -0,0 +1,196 @@
+# src/models/tree_export.py
+
+import json
+
+import numpy as np
+
+
+class FlatTreeEnsemble:
+    """
+    A binary:logistic XGBoost model flattened into NumPy node arrays.
+
+    All trees share one set of arrays indexed by a global node id: the split
+    feature, the threshold, the child taken when the feature is below the
+    threshold (left), otherwise (right) or missing (default), and the leaf
+    value. Leaves point back at themselves, so every row can be walked
+    through every tree in lockstep for exactly `max_depth` steps without
+    checking which rows have already reached a leaf.
+    """
+
+    def __init__(self, feature, threshold, left, right, default, value, roots, max_depth,
+                 base_margin, feature_names=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default = default
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.base_margin = base_margin
+        self.feature_names = feature_names
+
+        # Children packed per node as [left, right, default], so each step of
+        # the walk is a single gather on node * 3 + branch.
+        self._children = np.column_stack([left, right, default]).astype(np.int64).ravel()
+        self._roots = np.asarray(roots, dtype=np.int64)
+
+    @classmethod
+    def from_xgboost(cls, model):
+        """
+        Export a trained XGBClassifier (or its Booster).
+
+        Parameters:
+        - model: A fitted xgboost.XGBClassifier or xgboost.Booster.
+
+        Returns:
+        - FlatTreeEnsemble: The flattened model.
+        """
+        booster = model.get_booster() if hasattr(model, 'get_booster') else model
+        learner = json.loads(booster.save_raw(raw_format='json'))['learner']
+
+        objective = learner['objective']['name']
+        if objective != 'binary:logistic':
+            raise ValueError(f"Only binary:logistic models can be flattened, got {objective}.")
+        if learner['gradient_booster']['name'] != 'gbtree':
+            raise ValueError(f"Only gbtree boosters can be flattened, got {learner['gradient_booster']['name']}.")
+
+        # Newer versions store base_score as a one-element list, e.g. '[2.08E-1]'
+        base_score = np.float32(learner['learner_model_param']['base_score'].strip('[]'))
+        base_margin = np.float32(np.log(base_score / (1 - base_score)))
+
+        features, thresholds, lefts, rights, defaults, values, roots = [], [], [], [], [], [], []
+        max_depth = 0
+        offset = 0
+        for tree in learner['gradient_booster']['model']['trees']:
+            left = np.asarray(tree['left_children'], dtype=np.int32)
+            right = np.asarray(tree['right_children'], dtype=np.int32)
+            conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+            default_left = np.asarray(tree['default_left'], dtype=bool)
+            if any(tree.get('split_type', [])):
+                raise ValueError("Categorical splits are not supported.")
+
+            n_nodes = len(left)
+            nodes = np.arange(n_nodes, dtype=np.int32)
+            is_leaf = left == -1
+
+            left = np.where(is_leaf, nodes, left)
+            right = np.where(is_leaf, nodes, right)
+            features.append(np.where(is_leaf, 0, tree['split_indices']).astype(np.int32))
+            thresholds.append(np.where(is_leaf, np.float32(0), conditions))
+            lefts.append(left + offset)
+            rights.append(right + offset)
+            defaults.append(np.where(default_left, left, right) + offset)
+            # For leaves, split_conditions holds the leaf value
+            values.append(np.where(is_leaf, conditions, np.float32(0)))
+            roots.append(offset)
+
+            max_depth = max(max_depth, _tree_depth(left, right, is_leaf))
+            offset += n_nodes
+
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds).astype(np.float32),
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            default=np.concatenate(defaults).astype(np.int32),
+            value=np.concatenate(values).astype(np.float32),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            base_margin=base_margin,
+            feature_names=booster.feature_names
+        )
+
+    def save(self, filepath):
+        """
+        Save the node arrays to an .npz file.
+        """
+        np.savez(
+            filepath, feature=self.feature, threshold=self.threshold, left=self.left,
+            right=self.right, default=self.default, value=self.value, roots=self.roots,
+            max_depth=self.max_depth, base_margin=self.base_margin,
+            feature_names=np.asarray(self.feature_names or [], dtype=str)
+        )
+
+    @classmethod
+    def load(cls, filepath):
+        """
+        Load a model saved with save().
+        """
+        data = np.load(filepath)
+        feature_names = list(data['feature_names']) or None
+        return cls(
+            feature=data['feature'], threshold=data['threshold'], left=data['left'],
+            right=data['right'], default=data['default'], value=data['value'], roots=data['roots'],
+            max_depth=int(data['max_depth']), base_margin=np.float32(data['base_margin']),
+            feature_names=feature_names
+        )
+
+    def predict_margin(self, X):
+        """
+        Raw scores (log-odds) for a batch of rows.
+
+        Margins are bit-identical to XGBoost scoring the rows one at a time.
+        For large batches XGBoost sums trees in blocks, which can move the
+        result by one float32 ulp.
+
+        Parameters:
+        - X (array or DataFrame): (n_rows, n_features) feature matrix; NaN is missing.
+
+        Returns:
+        - ndarray: float32 margin per row.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+
+        n_rows, n_features = X.shape
+        flat_X = X.ravel()
+        row_offsets = np.arange(n_rows, dtype=np.int64)[:, None] * n_features
+        has_missing = np.isnan(flat_X).any()
+
+        nodes = np.broadcast_to(self._roots, (n_rows, len(self._roots)))
+        for _ in range(self.max_depth):
+            x = flat_X.take(row_offsets + self.feature.take(nodes))
+            branch = (x >= self.threshold.take(nodes)).astype(np.int64)
+            if has_missing:
+                # NaN compares False, which would always go left
+                branch[np.isnan(x)] = 2
+            nodes = self._children.take(nodes * 3 + branch)
+
+        # Add the trees to the base margin one after another in float32, the
+        # same order XGBoost uses, so the margins match bit for bit.
+        terms = np.empty((n_rows, len(self.roots) + 1), dtype=np.float32)
+        terms[:, 0] = self.base_margin
+        terms[:, 1:] = self.value.take(nodes)
+        return np.cumsum(terms, axis=1, dtype=np.float32)[:, -1]
+
+    def predict_proba(self, X):
+        """
+        Class probabilities in the same (n_rows, 2) layout as XGBClassifier.predict_proba.
+
+        The sigmoid uses NumPy's float32 exp, which can differ from XGBoost's
+        by one ulp (about 6e-8); predicted labels are unaffected.
+        """
+        margin = self.predict_margin(X)
+        positive = np.float32(1) / (np.float32(1) + np.exp(-margin))
+        return np.column_stack([1 - positive, positive])
+
+    def predict(self, X, threshold=0.5):
+        """
+        Class labels, 1 where the positive probability exceeds the threshold.
+        """
+        return (self.predict_proba(X)[:, 1] > threshold).astype(np.int64)
+
+
+def _tree_depth(left, right, is_leaf):
+    """
+    Number of splits on the longest root-to-leaf path of one tree.
+    """
+    depth = 0
+    frontier = np.array([0])
+    while not is_leaf[frontier].all():
+        frontier = frontier[~is_leaf[frontier]]
+        frontier = np.concatenate([left[frontier], right[frontier]])
+        depth += 1
+    return depth
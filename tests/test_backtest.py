@@ -0,0 +1,108 @@
+# tests/test_backtest.py
+
+import unittest
+import numpy as np
+import pandas as pd
+from src.models.backtest import (
+    backtest_token, build_bar_panel, compute_exits, count_alerts, parameter_sweep, rule_signals, run_backtest,
+    simulate_trades
+)
+
+def make_bars():
+    frames = []
+    for address, close in [('A', [2.0, 1.0, 3.0, 4.0, 5.0, 5.5, 5.0, 4.0]), ('B', [1.0, 1.2, 2.5, 2.0, 2.2, 2.4, 2.0, 1.8])]:
+        frames.append(pd.DataFrame({
+            'address': address,
+            'datetime': pd.date_range('2024-09-01', periods=len(close), freq='15min', tz='UTC'),
+            'close': close,
+            'volume': 100.0,
+            'probability': np.linspace(0, 1, len(close))
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+class TestBacktest(unittest.TestCase):
+    def test_rule_signals_window_low(self):
+        close = np.array([2.0, 1.0, 3.0, 4.0, 5.0, 5.5])
+        volume = np.full(6, 100.0)
+        signals = rule_signals(close, volume, window_bars=3, increase_factor=5.0, min_volume=400)
+        # Bar 4's window (bars 1-4) holds the low of 1.0; by bar 5 it has dropped out
+        self.assertEqual(list(signals), [False, False, False, False, True, False])
+        self.assertFalse(rule_signals(close[:3], volume[:3], window_bars=3, min_volume=0).any())
+
+    def test_rule_signals_volume_threshold(self):
+        close = np.array([2.0, 1.0, 3.0, 4.0, 5.0, 5.5])
+        self.assertFalse(rule_signals(close, np.full(6, 100.0), window_bars=3, min_volume=401).any())
+        # Volume before the window does not count, the current bar's does
+        volume = np.array([1000.0, 0.0, 0.0, 0.0, 400.0, 0.0])
+        self.assertEqual(list(rule_signals(close, volume, window_bars=3, min_volume=400)),
+                         [False, False, False, False, True, False])
+        volume = np.array([1000.0, 0.0, 0.0, 0.0, 399.0, 0.0])
+        self.assertFalse(rule_signals(close, volume, window_bars=3, min_volume=400).any())
+
+    def test_backtest_token_strategies(self):
+        panel = build_bar_panel(make_bars(), probability_column='probability')
+        result = backtest_token(panel['A'], window_bars=3, increase_factor=5.0, min_volume=400, hold_bars=2, fee=0.0, slippage=0.0)
+        # One signal at bar 4, exited two bars later at 5.0
+        self.assertEqual(result, {'alerts': 1, 'trades': 1, 'wins': 0, 'pnl': 0.0})
+
+        result = backtest_token(panel['A'], strategy='model', threshold=0.9, hold_bars=2)
+        self.assertEqual(result['alerts'], 1)
+        with self.assertRaises(ValueError):
+            backtest_token(build_bar_panel(make_bars())['A'], strategy='model')
+
+    def test_parameter_sweep_matches_run_backtest(self):
+        panel = build_bar_panel(make_bars())
+        grid = {'window_bars': [1, 3], 'increase_factor': [2.0, 5.0], 'min_volume': [0]}
+        results = parameter_sweep(panel, grid, max_workers=2)
+        self.assertEqual(len(results), 4)
+        for row in results.to_dict('records'):
+            params = {name: row[name] for name in grid}
+            expected = run_backtest(panel, **params)
+            self.assertEqual(row['trades'], expected['trades'])
+            self.assertEqual(row['alerts'], expected['alerts'])
+            self.assertAlmostEqual(row['pnl'], expected['pnl'])
+        self.assertGreater(results['trades'].sum(), 0)
+
+    def test_compute_exits_take_profit(self):
+        close = np.array([1.0, 1.0, 2.5, 1.0, 1.0, 1.0])
+        exits = compute_exits(close, np.array([0]), hold_bars=4, take_profit=1.0)
+        self.assertEqual(list(exits), [2])
+
+    def test_compute_exits_stop_loss(self):
+        close = np.array([1.0, 0.9, 0.6, 1.2, 1.2])
+        exits = compute_exits(close, np.array([0]), hold_bars=3, stop_loss=0.3)
+        self.assertEqual(list(exits), [2])
+
+    def test_compute_exits_hold_truncated_at_end(self):
+        close = np.array([1.0, 1.1, 1.2, 1.3, 1.4])
+        entries = np.array([0, 3])
+        self.assertEqual(list(compute_exits(close, entries, hold_bars=2)), [2, 4])
+        # No level reached: the trade still closes at the last bar
+        exits = compute_exits(close, entries, hold_bars=10, take_profit=5.0, stop_loss=0.9)
+        self.assertEqual(list(exits), [4, 4])
+
+    def test_simulate_trades_skips_overlapping_signals(self):
+        close = np.arange(1.0, 11.0)
+        signals = np.zeros(10, dtype=bool)
+        signals[[0, 1, 2, 5, 9]] = True
+        entries, net_returns = simulate_trades(close, signals, hold_bars=3, fee=0.0, slippage=0.0)
+        # Bars 1 and 2 fall inside the first trade (exit at bar 3); bar 9 is the last bar
+        self.assertEqual(list(entries), [0, 5])
+        np.testing.assert_allclose(net_returns, [4.0 / 1.0 - 1, 9.0 / 6.0 - 1])
+
+    def test_simulate_trades_fee_and_slippage(self):
+        close = np.array([1.0, 2.0])
+        signals = np.array([True, False])
+        _, net_returns = simulate_trades(close, signals, hold_bars=1, fee=0.01, slippage=0.02)
+        expected = (2.0 * 0.98) / (1.0 * 1.02) * 0.99 ** 2 - 1
+        np.testing.assert_allclose(net_returns, [expected])
+
+    def test_count_alerts_with_cooldown(self):
+        signals = np.array([1, 1, 0, 1, 0, 0, 1, 0, 0, 0, 1], dtype=bool)
+        # Rising edges at bars 0, 3, 6 and 10
+        self.assertEqual(count_alerts(signals), 4)
+        self.assertEqual(count_alerts(signals, cooldown_bars=3), 3)
+        self.assertEqual(count_alerts(np.zeros(0, dtype=bool)), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,27 @@
 # tests/test_data_collection.py
 
 import unittest
-from src.data.data_collection import fetch_historical_token_data
+import numpy as np
+import pandas as pd
+from src.data.data_collection import detect_5x_events, fetch_historical_token_data
+
+def detect_5x_events_reference(df, window_minutes, min_volume):
+    # The original per-bar filter, kept as the specification
+    events = []
+    for address, token_data in df.groupby('address'):
+        token_data = token_data.sort_values('datetime', kind='stable').reset_index(drop=True)
+        window_size = pd.Timedelta(minutes=window_minutes)
+        for i in range(len(token_data)):
+            start_time = token_data.loc[i, 'datetime']
+            window_data = token_data[(token_data['datetime'] >= start_time) & (token_data['datetime'] <= start_time + window_size)]
+            if len(window_data) > 1:
+                start_price = window_data.iloc[0]['close']
+                max_price = window_data['close'].max()
+                total_volume = window_data['volume'].sum()
+                if max_price >= 5 * start_price and total_volume >= min_volume:
+                    events.append((address, start_time, window_data.loc[window_data['close'].idxmax(), 'datetime'],
+                                   start_price, max_price, total_volume))
+    return events
 
 class TestDataCollection(unittest.TestCase):
     def test_fetch_historical_token_data(self):
@@ -11,5 +31,44 @@ class TestDataCollection(unittest.TestCase):
         self.assertIn('token_name', data.columns)
         self.assertIn('price', data.columns)
 
+class TestDetect5xEvents(unittest.TestCase):
+    def test_matches_per_bar_scan(self):
+        rng = np.random.default_rng(7)
+        frames = []
+        for address in ['A', 'B', 'C']:
+            # Irregular minute bars with gaps, a few repeated timestamps and tied peaks
+            minutes = np.sort(rng.choice(600, size=300, replace=False))
+            minutes[10] = minutes[11]
+            close = np.round(np.exp(np.cumsum(rng.normal(0, 0.8, size=300))), 1) + 0.1
+            frames.append(pd.DataFrame({
+                'address': address,
+                'datetime': pd.Timestamp('2024-09-01', tz='UTC') + pd.to_timedelta(minutes, unit='min'),
+                'close': close,
+                'volume': rng.exponential(2000, size=300)
+            }))
+        df = pd.concat(frames, ignore_index=True).sample(frac=1, random_state=0)
+
+        for window_minutes in [5, 15, 60]:
+            expected = detect_5x_events_reference(df, window_minutes, min_volume=5000)
+            events = detect_5x_events(df, window_minutes=window_minutes, min_volume=5000)
+            self.assertGreater(len(expected), 0)
+            self.assertEqual(len(events), len(expected))
+            for event, (address, start_time, end_time, start_price, max_price, total_volume) in zip(events, expected):
+                self.assertEqual((event['address'], event['start_time'], event['end_time']), (address, start_time, end_time))
+                self.assertEqual(event['start_price'], start_price)
+                self.assertEqual(event['end_price'], max_price)
+                self.assertAlmostEqual(event['total_volume'], total_volume, places=6)
+                self.assertEqual(event['window_size'], window_minutes)
+
+    def test_single_bar_windows_are_skipped(self):
+        df = pd.DataFrame({
+            'address': 'A',
+            'datetime': pd.to_datetime(['2024-09-01 00:00', '2024-09-01 01:00'], utc=True),
+            'close': [1.0, 10.0],
+            'volume': [1e6, 1e6]
+        })
+        self.assertEqual(detect_5x_events(df, window_minutes=15), [])
+        self.assertEqual(len(detect_5x_events(df, window_minutes=60)), 1)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,87 @@
+# tests/test_event_store.py
+
+import glob
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from src.data.event_store import EPISODE_COLUMNS, EventStore, collapse_episodes
+
+def make_event(address, start, end, start_price=1.0, end_price=5.0):
+    return {
+        'address': address,
+        'start_time': pd.Timestamp(start, tz='UTC'),
+        'end_time': pd.Timestamp(end, tz='UTC'),
+        'start_price': start_price,
+        'end_price': end_price,
+        'increase_factor': end_price / start_price,
+        'window_size': 1440,
+        'total_volume': 20000.0
+    }
+
+EVENTS = [
+    # One pump detected from three consecutive start bars
+    make_event('A', '2024-09-22 15:45', '2024-09-23 14:45', 1.0, 5.5),
+    make_event('A', '2024-09-22 16:00', '2024-09-23 14:45', 0.9, 5.5),
+    make_event('A', '2024-09-22 16:15', '2024-09-23 15:00', 0.8, 6.0),
+    # A later, separate pump of the same token
+    make_event('A', '2024-09-28 10:00', '2024-09-28 12:00', 2.0, 11.0),
+    make_event('B', '2024-09-23 08:00', '2024-09-23 09:00', 1.0, 7.0)
+]
+
+class TestEventStore(unittest.TestCase):
+    def test_collapse_episodes(self):
+        episodes = collapse_episodes(EVENTS)
+        self.assertEqual(len(episodes), 3)
+
+        first = episodes.iloc[0]
+        self.assertEqual(first['count'], 3)
+        self.assertEqual(first['first_start'], pd.Timestamp('2024-09-22 15:45', tz='UTC'))
+        self.assertEqual(first['end_time'], pd.Timestamp('2024-09-23 15:00', tz='UTC'))
+        self.assertEqual(first['peak_price'], 6.0)
+
+    def test_append_and_query(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = EventStore(root)
+            self.assertEqual(store.append(EVENTS), 3)
+            # A second run over the same history must not duplicate episodes
+            store.append(EVENTS)
+
+            self.assertEqual(len(store.query()), 3)
+            self.assertEqual(len(store.query(address='A')), 2)
+            self.assertEqual(len(store.query(window=60)), 0)
+
+            in_range = store.query(start='2024-09-23 12:00', end='2024-09-24')
+            self.assertEqual(list(in_range['address']), ['A'])
+            self.assertEqual(in_range['count'].iloc[0], 3)
+
+    def test_query_scalar_types_and_empty_store(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = EventStore(root)
+            self.assertEqual(list(store.query().columns), EPISODE_COLUMNS)
+
+            store.append(EVENTS)
+            episodes = store.query()
+            window = episodes['window'].iloc[0]
+            self.assertIsInstance(window, np.integer)
+            self.assertEqual(len(store.query(window=window)), 3)
+            self.assertEqual(len(store.query(address=np.str_('B'))), 1)
+            self.assertEqual(list(store.query(window=60).columns), EPISODE_COLUMNS)
+
+    def test_compact_merges_repeated_runs(self):
+        with tempfile.TemporaryDirectory() as root:
+            store = EventStore(root)
+            for _ in range(4):
+                store.append(EVENTS)
+            before = store.query()
+            n_partitions = len({os.path.dirname(part) for part in glob.glob(os.path.join(root, '*', '*', '*.parquet'))})
+            self.assertEqual(len(glob.glob(os.path.join(root, '*', '*', '*.parquet'))), 4 * n_partitions)
+
+            self.assertEqual(store.compact(), n_partitions)
+            self.assertEqual(len(glob.glob(os.path.join(root, '*', '*', '*.parquet'))), n_partitions)
+            pd.testing.assert_frame_equal(store.query(), before)
+            self.assertEqual(store.compact(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
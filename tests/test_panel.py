@@ -0,0 +1,82 @@
+# tests/test_panel.py
+
+import unittest
+import numpy as np
+import pandas as pd
+from src.data.data_collection import compute_features
+from src.data.panel import build_panel, compute_panel_features, cross_sectional_rank, market_volume_surge
+
+class TestPanel(unittest.TestCase):
+    def test_compute_panel_features_matches_compute_features(self):
+        rng = np.random.default_rng(0)
+        times = pd.date_range('2024-09-01', periods=120, freq='1min', tz='UTC')
+        frames = []
+        for address, offset in [('A', 0), ('B', 30)]:
+            volume = rng.lognormal(5, 1, 120 - offset)
+            volume[::7] = 0
+            frames.append(pd.DataFrame({
+                'address': address,
+                'datetime': times[offset:],
+                # Values exact in float32, so both paths see the same inputs
+                'close': rng.lognormal(0, 0.1, 120 - offset).astype(np.float32).astype(np.float64),
+                'volume': volume.astype(np.float32).astype(np.float64)
+            }))
+        df = pd.concat(frames, ignore_index=True)
+
+        panel = build_panel(df, interval='1m')
+        features = compute_panel_features(panel)
+        merged = pd.concat([compute_features(token_data.copy()) for _, token_data in df.groupby('address')])
+        merged = merged.merge(panel.to_frame(features), on=['address', 'datetime'], suffixes=('', '_panel'))
+        self.assertEqual(len(merged), len(df))
+        for name in features:
+            np.testing.assert_allclose(merged[f'{name}_panel'], merged[name], rtol=1e-5, atol=1e-6, err_msg=name)
+        # Bars before B was listed are not in the panel
+        self.assertTrue(np.isnan(features['price_change'][1, :30]).all())
+
+    def test_price_change_periods_follow_interval(self):
+        times = pd.date_range('2024-09-01', periods=12, freq='15min', tz='UTC')
+        df = pd.DataFrame({'address': 'A', 'datetime': times, 'close': 2.0 ** np.arange(12), 'volume': 1.0})
+        features = compute_panel_features(build_panel(df, interval='15m'))
+
+        # On 15m bars the 15m change is one bar and the 1h change four bars
+        self.assertAlmostEqual(features['price_change_15m'][0, 5], 1.0)
+        self.assertAlmostEqual(features['price_change_1h'][0, 5], 15.0)
+        self.assertTrue(np.isnan(features['price_change_5m']).all())
+
+        with self.assertRaises(ValueError):
+            compute_panel_features(build_panel(df))
+
+    def test_cross_sectional_rank_ties_and_nan(self):
+        values = np.array([
+            [0.0, 3.0, np.nan],
+            [0.0, 1.0, np.nan],
+            [2.0, np.nan, np.nan],
+            [0.0, 1.0, 5.0]
+        ], dtype=np.float32)
+        ranks = cross_sectional_rank(values)
+        expected = pd.DataFrame(values).rank(pct=True).to_numpy()
+        np.testing.assert_allclose(ranks, expected, rtol=1e-6)
+        # Three tied zeros share rank 2 of 4
+        np.testing.assert_allclose(ranks[[0, 1, 3], 0], 0.5)
+        self.assertTrue(np.isnan(ranks[2, 1]))
+
+    def test_cross_sectional_rank_matches_pandas(self):
+        rng = np.random.default_rng(1)
+        values = rng.integers(0, 5, size=(40, 25)).astype(np.float32)
+        values[rng.random(values.shape) < 0.3] = np.nan
+        expected = pd.DataFrame(values).rank(pct=True).to_numpy()
+        np.testing.assert_allclose(cross_sectional_rank(values), expected, rtol=1e-6)
+
+    def test_market_volume_surge(self):
+        rng = np.random.default_rng(2)
+        volume = rng.lognormal(5, 1, size=(6, 50)).astype(np.float32)
+        volume[rng.random(volume.shape) < 0.2] = np.nan
+        market_volume = pd.Series(np.nansum(volume, axis=0, dtype=np.float64))
+        expected = market_volume / market_volume.rolling(10).mean().shift(1)
+
+        surge = market_volume_surge(volume, lookback=10)
+        self.assertTrue(np.isnan(surge[:10]).all())
+        np.testing.assert_allclose(surge[10:], expected[10:], rtol=1e-6)
+
+if __name__ == '__main__':
+    unittest.main()
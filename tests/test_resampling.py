@@ -0,0 +1,89 @@
+# tests/test_resampling.py
+
+import unittest
+import numpy as np
+import pandas as pd
+from src.data.resampling import OHLCVPyramid, build_pyramid, detection_interval, resample_ohlcv
+
+def make_bars(address, start, n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'address': address,
+        'timestamp': start + 60 * np.arange(n),
+        'open': close * (1 + rng.normal(0, 0.001, n)),
+        'high': close * 1.01,
+        'low': close * 0.99,
+        'close': close,
+        'volume': rng.uniform(0, 100, n)
+    })
+
+class TestResampling(unittest.TestCase):
+    def test_resample_ohlcv_aggregation(self):
+        # Starts two minutes into a 5m bucket, so the first bucket has three bars
+        bars = make_bars('A', 1_700_000_100 + 120, 20)
+        resampled = resample_ohlcv(bars, '5m')
+
+        first_bucket = bars.iloc[:3]
+        row = resampled.iloc[0]
+        self.assertEqual(row['timestamp'], 1_700_000_100)
+        self.assertAlmostEqual(row['open'], first_bucket['open'].iloc[0])
+        self.assertAlmostEqual(row['high'], first_bucket['high'].max())
+        self.assertAlmostEqual(row['low'], first_bucket['low'].min())
+        self.assertAlmostEqual(row['close'], first_bucket['close'].iloc[-1])
+        self.assertAlmostEqual(row['volume'], first_bucket['volume'].sum())
+        self.assertAlmostEqual(resampled['volume'].sum(), bars['volume'].sum())
+
+    def test_incremental_update_matches_full_build(self):
+        bars = pd.concat([make_bars('A', 1_700_000_000, 500, seed=1), make_bars('B', 1_700_000_000, 400, seed=2)])
+        full = build_pyramid(bars, base_interval='1m')
+
+        pyramid = OHLCVPyramid(base_interval='1m')
+        for _, chunk in bars.groupby(bars['timestamp'] // 420):
+            pyramid.update(chunk)
+
+        for interval in full.intervals:
+            pd.testing.assert_frame_equal(pyramid.get(interval), full.get(interval))
+
+    def test_levels_match_resample_ohlcv(self):
+        bars = pd.concat([make_bars('A', 1_700_000_000, 500, seed=1), make_bars('B', 1_700_003_000, 400, seed=2)])
+        pyramid = OHLCVPyramid(base_interval='1m')
+        # Later chunks first, so updates land before and inside the stored series
+        chunks = [chunk for _, chunk in bars.groupby(bars['timestamp'] // 3600)]
+        for chunk in chunks[::-1]:
+            pyramid.update(chunk)
+
+        for interval in pyramid.levels:
+            expected = resample_ohlcv(bars, interval)
+            pd.testing.assert_frame_equal(pyramid.get(interval), expected, check_dtype=False)
+        pd.testing.assert_frame_equal(pyramid.get('15m', address='B'), resample_ohlcv(bars[bars['address'] == 'B'], '15m'),
+                                      check_dtype=False)
+        self.assertTrue(pyramid.get('15m', address='C').empty)
+
+    def test_forming_bar_is_replaced(self):
+        bars = make_bars('A', 1_700_000_100, 10)
+        pyramid = build_pyramid(bars, base_interval='1m')
+        level = pyramid.get('5m')
+
+        forming = bars.iloc[[-1]].copy()
+        forming['close'] = 50.0
+        forming['high'] = 50.0
+        forming['volume'] += 10
+        pyramid.update(forming)
+
+        self.assertEqual(len(pyramid.get('1m')), 10)
+        self.assertEqual(pyramid.get('1m')['close'].iloc[-1], 50.0)
+        last = pyramid.get('5m').iloc[-1]
+        self.assertEqual(last['close'], 50.0)
+        self.assertEqual(last['high'], 50.0)
+        self.assertAlmostEqual(last['volume'], level['volume'].iloc[-1] + 10)
+        # The cached frame from before the update is untouched
+        self.assertNotEqual(level['close'].iloc[-1], 50.0)
+
+    def test_detection_interval_never_finer_than_base(self):
+        self.assertEqual(detection_interval(5, '1m'), '1m')
+        self.assertEqual(detection_interval(1440, '1m'), '15m')
+        self.assertEqual(detection_interval(5, '15m'), '15m')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# tests/test_scheduler.py
+
+import unittest
+import numpy as np
+import pandas as pd
+from src.data.scheduler import PollingScheduler, simulate_polling
+
+def make_bars(close):
+    close = np.asarray(close, dtype=float)
+    return pd.DataFrame({
+        'timestamp': 60 * np.arange(len(close)),
+        'close': close,
+        'volume': np.full(len(close), 100.0)
+    })
+
+class TestPollingScheduler(unittest.TestCase):
+    def test_budget_refill_and_cap(self):
+        scheduler = PollingScheduler(requests_per_minute=60)
+        for i in range(200):
+            scheduler.add_token(f'token_{i}', now=0)
+
+        self.assertEqual(len(scheduler.next_batch(0)), 60)
+        self.assertEqual(scheduler.next_batch(0), [])
+        # One request per second refills
+        self.assertEqual(len(scheduler.next_batch(10)), 10)
+        # A long idle spell still allows only one minute's worth
+        self.assertEqual(len(scheduler.next_batch(1000)), 60)
+        self.assertEqual(scheduler.requests_made, 130)
+
+    def test_over_budget_tokens_stay_due_hottest_first(self):
+        scheduler = PollingScheduler(requests_per_minute=2, max_interval=600, adaptive=False)
+        for address in ['calm', 'hot', 'warm']:
+            scheduler.add_token(address, now=0)
+
+        self.assertEqual(scheduler.next_batch(0), ['calm', 'hot'])
+        self.assertEqual(scheduler.next_batch(0), [])
+        self.assertEqual(scheduler.next_batch(30), ['warm'])
+
+        scheduler.record_poll('calm', make_bars([1.0] * 10), now=0)
+        scheduler.record_poll('hot', make_bars([1.0, 2.0] * 5), now=0)
+        scheduler.record_poll('warm', make_bars([1.0, 1.1] * 5), now=30)
+
+        self.assertEqual(scheduler.next_batch(700), ['hot', 'warm'])
+        self.assertEqual(scheduler.next_batch(700), [])
+        self.assertEqual(scheduler.next_batch(730), ['calm'])
+
+    def test_fresh_listing_jumps_a_saturated_budget(self):
+        scheduler = PollingScheduler(requests_per_minute=10, min_interval=60, max_interval=600)
+        volatile = make_bars([1.0, 1.1] * 10)
+        for i in range(500):
+            scheduler.add_token(f'token_{i}', now=0)
+        now = 0
+        while now < 1800:
+            for address in scheduler.next_batch(now):
+                scheduler.record_poll(address, volatile, now)
+            now += 60
+
+        scheduler.add_token('fresh', now=now, listed_at=now)
+        self.assertGreater(scheduler.tokens['fresh']['score'], 0)
+        self.assertIn('fresh', scheduler.next_batch(now))
+
+    def test_discover_skips_tracked_tokens(self):
+        scheduler = PollingScheduler()
+        scheduler.add_token('A', now=0)
+        listings = pd.DataFrame({
+            'token_address': ['A', 'B', 'C'],
+            'listed_time': [10.0, 20.0, np.nan]
+        })
+
+        self.assertEqual(scheduler.discover(listings, now=50), ['B', 'C'])
+        self.assertEqual(scheduler.discover(listings, now=60), [])
+        self.assertEqual(len(scheduler.tokens), 3)
+        self.assertEqual(scheduler.tokens['B']['listed_at'], 20.0)
+        self.assertIsNone(scheduler.tokens['C']['listed_at'])
+
+    def test_simulated_polls_skip_the_forming_bar(self):
+        times = pd.Timestamp('2024-09-01', tz='UTC') + pd.to_timedelta(np.arange(30), unit='min')
+        historical_df = pd.DataFrame({'address': 'A', 'datetime': times, 'close': 1.0, 'volume': 100.0})
+        start = (times[0] - pd.Timestamp(0, tz='UTC')).total_seconds()
+        events = [{'address': 'A', 'end_time': times[10]}]
+
+        scheduler = PollingScheduler(min_interval=60, max_interval=60)
+        result = simulate_polling(historical_df, events, scheduler, tick=60, start=start + 600, end=start + 600)
+        # The bar that opened at the poll time is still forming
+        self.assertEqual(scheduler.tokens['A']['last_timestamp'], start + 540)
+        # The event bar closes at start + 660, after the only poll
+        self.assertEqual(result['missed'], 1)
+
+        scheduler = PollingScheduler(min_interval=60, max_interval=60)
+        result = simulate_polling(historical_df, events, scheduler, tick=60, start=start + 600, end=start + 720, interval='1m')
+        self.assertEqual(result['detected'], 1)
+        self.assertEqual(result['mean_latency'], 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
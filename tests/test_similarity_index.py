@@ -0,0 +1,96 @@
+# tests/test_similarity_index.py
+
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from src.analysis.similarity_index import TrajectoryIndex, build_index_from_events, build_pre_event_vectors, load_events_from_store
+from src.data.event_store import EventStore
+
+def brute_force(stored, queries, k):
+    distances = np.sqrt(((queries[:, None, :].astype(np.float64) - stored[None, :, :]) ** 2).sum(axis=2))
+    order = np.argsort(distances, axis=1, kind='stable')[:, :k]
+    return np.take_along_axis(distances, order, axis=1), order
+
+class TestTrajectoryIndex(unittest.TestCase):
+    def check_against_brute_force(self, n_stored, k, block_size, n_adds):
+        rng = np.random.default_rng(n_stored + k + block_size)
+        stored = rng.standard_normal((n_stored, 6)).astype(np.float32)
+        queries = rng.standard_normal((25, 6)).astype(np.float32)
+
+        index = TrajectoryIndex(dim=6, block_size=block_size, initial_capacity=4)
+        for chunk in np.array_split(stored, n_adds):
+            index.add(chunk)
+        self.assertEqual(len(index), n_stored)
+
+        distances, positions = index.query(queries, k=k)
+        expected_distances, expected_positions = brute_force(stored, queries, k)
+        np.testing.assert_allclose(distances, expected_distances, rtol=1e-4, atol=1e-4)
+        np.testing.assert_array_equal(positions, expected_positions)
+
+    def test_query_matches_brute_force(self):
+        self.check_against_brute_force(n_stored=500, k=5, block_size=64, n_adds=7)
+
+    def test_query_with_k_larger_than_block(self):
+        self.check_against_brute_force(n_stored=300, k=20, block_size=8, n_adds=5)
+
+    def test_query_with_k_larger_than_index(self):
+        index = TrajectoryIndex(dim=3, block_size=2)
+        index.add(np.eye(3, dtype=np.float32))
+        distances, positions = index.query(np.zeros((2, 3), dtype=np.float32), k=10)
+        self.assertEqual(positions.shape, (2, 3))
+        np.testing.assert_allclose(distances, 1.0)
+
+    def test_build_pre_event_vectors_skips_short_history(self):
+        times = pd.date_range('2024-09-01', periods=50, freq='15min', tz='UTC')
+        historical_df = pd.DataFrame({
+            'address': 'A',
+            'datetime': times,
+            'close': np.linspace(1, 2, 50),
+            'volume': np.arange(50, dtype=float)
+        })
+        events_df = pd.DataFrame({
+            'address': ['A', 'A', 'A', 'B'],
+            'start_time': [times[5], times[40], times[40], times[40]],
+            'increase_factor': [5.0, 6.0, 6.0, 7.0]
+        })
+
+        vectors, metadata = build_pre_event_vectors(historical_df, events_df, lookback_bars=10)
+        # Only the event at bar 40 of token A has 10 bars of history; its duplicate is dropped
+        self.assertEqual(vectors.shape, (1, 20))
+        self.assertEqual(list(metadata['start_time']), [times[40]])
+        self.assertAlmostEqual(vectors[0, 9], 0.0)
+
+    def test_load_events_from_store(self):
+        times = pd.date_range('2024-09-01', periods=50, freq='15min', tz='UTC')
+        historical_df = pd.DataFrame({
+            'address': 'A',
+            'datetime': times,
+            'close': np.linspace(1, 2, 50),
+            'volume': np.arange(50, dtype=float)
+        })
+        # Two consecutive start bars of the same pump collapse into one episode
+        events = [{
+            'address': 'A',
+            'start_time': start,
+            'end_time': times[45],
+            'start_price': 1.0,
+            'end_price': 5.0,
+            'increase_factor': 5.0,
+            'window_size': 1440,
+            'total_volume': 20000.0
+        } for start in times[40:42]]
+
+        with tempfile.TemporaryDirectory() as root:
+            store = EventStore(root)
+            store.append(events)
+            events_df = load_events_from_store(store, window=1440)
+
+        self.assertEqual(list(events_df['start_time']), [times[40]])
+        self.assertEqual(events_df['increase_factor'].iloc[0], 5.0)
+        index = build_index_from_events(historical_df, events_df, lookback_bars=10)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.metadata['start_time'].iloc[0], times[40])
+
+if __name__ == '__main__':
+    unittest.main()
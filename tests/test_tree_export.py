@@ -0,0 +1,40 @@
+# tests/test_tree_export.py
+
+import os
+import tempfile
+import unittest
+import numpy as np
+import xgboost as xgb
+from src.models.tree_export import FlatTreeEnsemble
+
+class TestTreeExport(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        X = rng.standard_normal((2000, 8)).astype(np.float32)
+        y = ((X[:, 0] + X[:, 1] ** 2 + rng.standard_normal(2000)) > 1.5).astype(int)
+        X[rng.random(X.shape) < 0.1] = np.nan
+        cls.X = X
+        cls.model = xgb.XGBClassifier(n_estimators=30, learning_rate=0.1, max_depth=5, random_state=42)
+        cls.model.fit(X, y)
+        cls.ensemble = FlatTreeEnsemble.from_xgboost(cls.model)
+
+    def test_single_row_margins_identical(self):
+        for i in range(50):
+            row = self.X[i:i + 1]
+            expected = self.model.predict(row, output_margin=True)
+            np.testing.assert_array_equal(self.ensemble.predict_margin(row), expected)
+
+    def test_batch_matches_predict_proba(self):
+        np.testing.assert_allclose(self.ensemble.predict_proba(self.X), self.model.predict_proba(self.X), rtol=0, atol=1e-6)
+        np.testing.assert_array_equal(self.ensemble.predict(self.X), self.model.predict(self.X))
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, 'model.npz')
+            self.ensemble.save(filepath)
+            loaded = FlatTreeEnsemble.load(filepath)
+        np.testing.assert_array_equal(loaded.predict_margin(self.X), self.ensemble.predict_margin(self.X))
+
+if __name__ == '__main__':
+    unittest.main()